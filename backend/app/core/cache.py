@@ -0,0 +1,53 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache whose entries expire after a fixed TTL
+
+    Not shared between worker processes; callers must tolerate entries
+    being up to `ttl` seconds stale in other workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value, or None if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove a single entry if present"""
+        self._data.pop(key, None)
+
+    def discard_where(self, predicate) -> None:
+        """Remove every entry whose key matches the predicate"""
+        for key in [key for key in self._data if predicate(key)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
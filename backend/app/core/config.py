@@ -7,12 +7,41 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    
+    # SQL instrumentation
+    SQL_ECHO: bool = False  # Log every statement (development only)
+    SQL_SLOW_QUERY_MS: float = 200.0
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10  # Identical statements per request before flagging N+1
+    SQL_SERVER_TIMING: bool = True
+    METRICS_TOKEN: str = ""  # Bearer token for /metrics; the endpoint is disabled while empty
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
     
+    # Argon2 password hashing cost (changing these rehashes passwords on next login)
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 102400  # KiB
+    ARGON2_PARALLELISM: int = 8
+    
+    # Password hashing pool (keeps Argon2 off the event loop)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    
+    # Authenticated principal cache (per worker process)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    
+    # Leaderboards (in-memory per worker, rebuilt from the database periodically)
+    LEADERBOARD_REFRESH_SECONDS: int = 300
+    
+    # Productivity analytics cache (per worker process)
+    ANALYTICS_CACHE_SIZE: int = 5000
+    ANALYTICS_CACHE_TTL_SECONDS: int = 600
+    
     # Email (Mailtrap)
     SMTP_HOST: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
@@ -20,6 +49,33 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = ""
     FROM_EMAIL: str = ""
     
+    # Email outbox sender
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: int = 30
+    SMTP_IDLE_TIMEOUT_SECONDS: int = 60
+    EMAIL_OUTBOX_RETENTION_HOURS: int = 72  # Sent messages; failed ones are kept for inspection
+    
+    # Background Google Calendar sync (concurrent jobs per worker process)
+    CALENDAR_SYNC_WORKERS: int = 4
+    CALENDAR_SYNC_STALE_SECONDS: int = 300
+    CALENDAR_SYNC_JOB_RETENTION_HOURS: int = 24  # Finished manual jobs; finished auto-sync jobs go sooner
+    
+    # Auto-sync of task edits to Google Calendar
+    CALENDAR_AUTOSYNC_ENABLED: bool = True
+    CALENDAR_AUTOSYNC_DEBOUNCE_SECONDS: float = 5.0
+    CALENDAR_AUTOSYNC_MAX_DELAY_SECONDS: float = 60.0
+    
+    # Google credential cache (per worker process)
+    GOOGLE_CREDENTIALS_CACHE_SIZE: int = 5000
+    GOOGLE_CREDENTIALS_CACHE_TTL_SECONDS: int = 3600
+    GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS: int = 300
+    
+    # Shared HTTP connection pool for Google OAuth and Calendar calls
+    GOOGLE_API_MAX_CONNECTIONS: int = 20
+    GOOGLE_API_TIMEOUT_SECONDS: float = 30.0
+    
     # Frontend
     FRONTEND_URL: str = "http://localhost:5173"
     
@@ -30,6 +86,9 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
     GOOGLE_REDIRECT_URI: str = "http://localhost:8000/api/calendar/callback"
+    GOOGLE_TOKEN_URI: str = "https://oauth2.googleapis.com/token"
+    GOOGLE_CALENDAR_API_ENDPOINT: str = ""  # Override for a local fake, e.g. http://127.0.0.1:8765/calendar/v3/
+    GOOGLE_CALENDAR_WEBHOOK_URL: str = ""  # Public HTTPS URL of /api/calendar/webhook; enables push channels
     
     @property
     def cors_origins_list(self) -> list[str]:
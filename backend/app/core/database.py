@@ -2,6 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
+from app.core.query_stats import query_stats
 
 # Convert PostgreSQL URL to async format
 db_url = settings.DATABASE_URL
@@ -12,11 +13,16 @@ DATABASE_URL = db_url.replace("postgresql://", "postgresql+asyncpg://", 1)
 # Create async engine
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True,  # Set to False in production
+    echo=settings.SQL_ECHO,
     future=True,
     pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
 )
 
+# Per-request query counts, slow query log and N+1 detection
+query_stats.instrument(engine.sync_engine)
+
 # Create async session maker
 AsyncSessionLocal = async_sessionmaker(
     engine,
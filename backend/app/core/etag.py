@@ -0,0 +1,55 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+# Clients may cache read responses but must revalidate them on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Build a weak ETag from cheap validator values
+
+    Args:
+        parts: Values that change whenever the response body would change
+
+    Returns:
+        Weak ETag header value
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check the request's If-None-Match header against an ETag
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client already holds the current representation
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: ignore the W/ prefix on either side
+    current = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == current for candidate in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Build an empty 304 response carrying the validator headers"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Attach validator headers to a full response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
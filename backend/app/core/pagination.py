@@ -0,0 +1,44 @@
+import base64
+import uuid
+from datetime import datetime
+
+# Page size limits for keyset-paginated list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    """
+    Encode a keyset position into an opaque cursor string
+
+    Args:
+        created_at: Creation timestamp of the last row on the page
+        row_id: ID of the last row on the page
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """
+    Decode an opaque cursor string back into a keyset position
+
+    Args:
+        cursor: Cursor previously returned by encode_cursor
+
+    Returns:
+        Tuple of (created_at, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
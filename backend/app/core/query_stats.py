@@ -0,0 +1,169 @@
+"""SQL instrumentation: per-request query counts, DB time, slow queries and N+1 detection"""
+import asyncio
+import time
+from collections import Counter
+from collections.abc import Coroutine
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+
+@dataclass
+class RequestQueryStats:
+    """Queries issued while handling one request"""
+    path: str = ""
+    count: int = 0
+    seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str = ""
+    statements: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Identical statements run at least `threshold` times (likely N+1)"""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value"""
+        timing = f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+        if self.count:
+            timing += f", db-slowest;dur={self.slowest_seconds * 1000:.1f}"
+        return timing
+
+
+@dataclass
+class RouteQueryStats:
+    """Totals for one route since startup"""
+    requests: int = 0
+    queries: int = 0
+    seconds: float = 0.0
+    max_queries: int = 0
+    n_plus_one: int = 0
+    slowest_seconds: float = 0.0
+    slowest_statement: str = ""
+
+
+def _compact(statement: str) -> str:
+    """Statement on one line, truncated for logs and metrics"""
+    return " ".join(statement.split())[:500]
+
+
+# Set by QueryStatsMiddleware for the duration of a request
+current_query_stats: ContextVar[RequestQueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def create_background_task(coro: Coroutine) -> asyncio.Task:
+    """
+    Start a task that may outlive the current request
+
+    Tasks copy the creating context, so one started from a request would
+    keep adding its queries to that request's stats. This one starts with
+    no current request.
+    """
+    context = copy_context()
+    context.run(current_query_stats.set, None)
+    return asyncio.create_task(coro, context=context)
+
+
+class QueryStatsRecorder:
+    """
+    Times every statement through cursor execute events
+
+    Statements are always timed and counted process-wide; inside a request
+    they are also attributed to it (the async engine runs events in the
+    caller's context). Statements slower than slow_query_ms are logged,
+    and a request repeating one statement n_plus_one_threshold times is
+    logged as a likely N+1.
+    """
+
+    def __init__(self, slow_query_ms: float, n_plus_one_threshold: int):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.routes: dict[str, RouteQueryStats] = {}
+        self._queries = 0
+        self._seconds = 0.0
+        self._slow = 0
+
+    def instrument(self, engine: Engine) -> None:
+        """Attach to an engine (the sync_engine of an AsyncEngine)"""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        self._queries += 1
+        self._seconds += elapsed
+
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+            stats.statements[statement] += 1
+            if elapsed > stats.slowest_seconds:
+                stats.slowest_seconds = elapsed
+                stats.slowest_statement = statement
+
+        if elapsed >= self.slow_query_seconds:
+            self._slow += 1
+            where = f" in {stats.path}" if stats is not None else ""
+            print(f"Slow query ({elapsed * 1000:.1f} ms){where}: {_compact(statement)}")
+
+    def _handle_error(self, context) -> None:
+        # A failed statement never reaches after_cursor_execute
+        if context.cursor is not None and context.connection is not None:
+            starts = context.connection.info.get("query_start")
+            if starts:
+                starts.pop()
+
+    def finish_request(self, route: str, stats: RequestQueryStats) -> None:
+        """Fold a finished request into its route's totals and flag N+1 patterns"""
+        totals = self.routes.get(route)
+        if totals is None:
+            totals = self.routes[route] = RouteQueryStats()
+        totals.requests += 1
+        totals.queries += stats.count
+        totals.seconds += stats.seconds
+        totals.max_queries = max(totals.max_queries, stats.count)
+        if stats.slowest_seconds > totals.slowest_seconds:
+            totals.slowest_seconds = stats.slowest_seconds
+            totals.slowest_statement = _compact(stats.slowest_statement)
+
+        repeated = stats.repeated(self.n_plus_one_threshold)
+        if repeated:
+            totals.n_plus_one += 1
+            statement, count = repeated[0]
+            print(f"Possible N+1 in {route}: {count}x {_compact(statement)}")
+
+    def metrics(self) -> dict:
+        """Process-wide and per-route query totals"""
+        return {
+            "queries": self._queries,
+            "db_ms": round(self._seconds * 1000, 1),
+            "slow_queries": self._slow,
+            "routes": {
+                route: {
+                    "requests": totals.requests,
+                    "queries": totals.queries,
+                    "avg_queries": round(totals.queries / totals.requests, 2),
+                    "max_queries": totals.max_queries,
+                    "db_ms": round(totals.seconds * 1000, 1),
+                    "n_plus_one": totals.n_plus_one,
+                    "slowest_ms": round(totals.slowest_seconds * 1000, 1),
+                    "slowest_statement": totals.slowest_statement,
+                }
+                for route, totals in sorted(self.routes.items(), key=lambda item: -item[1].seconds)
+            },
+        }
+
+
+query_stats = QueryStatsRecorder(
+    slow_query_ms=settings.SQL_SLOW_QUERY_MS,
+    n_plus_one_threshold=settings.SQL_N_PLUS_ONE_THRESHOLD,
+)
@@ -0,0 +1,70 @@
+"""Idempotent upgrades for databases created before later columns and indexes"""
+from sqlalchemy import Table
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateSequence
+
+from app.models.calendar_sync_job import CalendarSyncJob
+from app.models.email_outbox import EmailOutbox
+from app.models.gamification import UserStats
+from app.models.google_token import GoogleToken
+from app.models.task import (
+    CHANGE_SEQ_TABLES,
+    PG_TRGM_DDL,
+    TASK_CHANGE_SEQ_FUNCTION_DDL,
+    TASK_TAGS_TEXT_DDL,
+    Task,
+    change_seq_trigger_ddl,
+    task_change_seq,
+)
+
+# Columns added to tables that already existed; create_all never alters
+# an existing table, so these are added here. Order matters: search_vector
+# is generated from task_tags_text(), created below before it.
+ADDED_COLUMNS: list[tuple[Table, list[str]]] = [
+    (Task.__table__, ["google_event_fingerprint", "last_synced_at", "change_seq", "search_vector"]),
+    (GoogleToken.__table__, [
+        "sync_token", "channel_id", "channel_resource_id", "channel_token", "channel_expiration",
+    ]),
+    (CalendarSyncJob.__table__, ["automatic"]),
+]
+
+# Tables whose model indexes may be missing on an existing database
+INDEXED_TABLES: list[Table] = [Task.__table__, UserStats.__table__, EmailOutbox.__table__]
+
+
+async def upgrade_schema(conn: AsyncConnection) -> None:
+    """
+    Bring an existing database up to the current models
+
+    Runs after create_all on every startup. Each statement is a no-op when
+    its object already exists, so fresh and upgraded databases end up with
+    the same schema. Column, index and sequence DDL is compiled from the
+    models themselves.
+
+    Args:
+        conn: Database connection (inside a transaction)
+    """
+    if conn.dialect.name != "postgresql":
+        return
+
+    await conn.execute(PG_TRGM_DDL)
+    await conn.execute(TASK_TAGS_TEXT_DDL)
+    await conn.execute(CreateSequence(task_change_seq, if_not_exists=True))
+
+    for table, columns in ADDED_COLUMNS:
+        for name in columns:
+            column = CreateColumn(table.c[name]).compile(dialect=conn.dialect)
+            await conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column}")
+
+    # Fresh databases get this as the inline UNIQUE constraint's index
+    await conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS google_tokens_channel_id_key ON google_tokens (channel_id)"
+    )
+
+    for table in INDEXED_TABLES:
+        for index in table.indexes:
+            await conn.execute(CreateIndex(index, if_not_exists=True))
+
+    await conn.execute(TASK_CHANGE_SEQ_FUNCTION_DDL)
+    for table in CHANGE_SEQ_TABLES:
+        await conn.execute(change_seq_trigger_ddl(table.name))
@@ -7,19 +7,35 @@ from passlib.context import CryptContext
 from app.core.config import settings
 
 # Password hashing context - using argon2 (modern, secure, no compatibility issues)
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+)
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
+    """Hash a password using argon2 (blocking; see app.services.password_hashing)"""
     return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
+    """Verify a password against its hash (blocking)"""
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password and rehash it if its parameters are outdated (blocking)
+    
+    Returns:
+        Tuple of (is_valid, new_hash); new_hash is None unless a rehash is needed
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """
     Create a JWT access token
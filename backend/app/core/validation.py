@@ -0,0 +1,17 @@
+from pydantic import ValidationError
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """
+    Flatten a pydantic ValidationError into a single readable line
+
+    Args:
+        error: Validation error raised for one item
+
+    Returns:
+        Semicolon-separated "field: message" pairs
+    """
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
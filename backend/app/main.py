@@ -1,12 +1,25 @@
+import hmac
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.core.database import AsyncSessionLocal, Base, engine
-from app.routes import auth, calendar, gamification, tasks
+from app.core.query_stats import query_stats
+from app.core.schema_upgrade import upgrade_schema
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.routes import auth, calendar, dashboard, gamification, tasks
+from app.services.calendar_autosync import calendar_auto_sync
+from app.services.calendar_client import calendar_clients
+from app.services.calendar_inbound import calendar_pulls
+from app.services.calendar_sync import calendar_sync_runner
+from app.services.email_outbox import email_outbox_worker
 from app.services.gamification import initialize_achievements
+from app.services.google_api import google_api
+from app.services.password_hashing import PasswordHasherBusy, password_hasher
+from app.services.xp_ledger import ensure_xp_event_partitions, xp_partition_maintainer
 
 
 @asynccontextmanager
@@ -17,9 +30,11 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting up...")
     
-    # Create database tables
+    # Create database tables, then add columns and indexes newer than existing tables
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await upgrade_schema(conn)
+        await ensure_xp_event_partitions(conn)
     
     # Initialize achievements
     async with AsyncSessionLocal() as db:
@@ -27,10 +42,28 @@ async def lifespan(app: FastAPI):
     
     print("Database initialized and achievements created")
     
+    # Start background email sender
+    email_outbox_worker.start()
+    
+    # Keep creating xp_events partitions ahead of time
+    xp_partition_maintainer.start()
+    
+    # Start debounced calendar auto-sync
+    if settings.CALENDAR_AUTOSYNC_ENABLED:
+        calendar_auto_sync.start()
+    
     yield
     
     # Shutdown
     print("Shutting down...")
+    await email_outbox_worker.stop()
+    await xp_partition_maintainer.stop()
+    await calendar_auto_sync.stop()
+    await calendar_pulls.shutdown()
+    await calendar_sync_runner.shutdown()
+    await calendar_clients.shutdown()
+    await google_api.aclose()
+    password_hasher.shutdown()
     await engine.dispose()
 
 
@@ -49,13 +82,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
+# SQL query counts and timing per request
+app.add_middleware(QueryStatsMiddleware, server_timing=settings.SQL_SERVER_TIMING)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Shed login/registration load instead of queueing unbounded hashing work"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(tasks.router, prefix="/api")
 app.include_router(gamification.router, prefix="/api")
 app.include_router(calendar.router, prefix="/api")
+app.include_router(dashboard.router, prefix="/api")
 
 
 @app.get("/")
@@ -72,3 +120,26 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+async def metrics(authorization: str = Header("")):
+    """
+    Internal service metrics
+    
+    Requires `Authorization: Bearer <METRICS_TOKEN>`; hidden when no token is configured
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not hmac.compare_digest(authorization.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    
+    return {
+        "password_hasher": password_hasher.metrics(),
+        "email_outbox": email_outbox_worker.metrics(),
+        "calendar_clients": calendar_clients.metrics(),
+        "calendar_auto_sync": calendar_auto_sync.metrics(),
+        "calendar_pulls": calendar_pulls.metrics(),
+        "sql": query_stats.metrics(),
+    }
@@ -1,8 +1,13 @@
+import uuid
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import decode_access_token
 from app.models.user import User
@@ -10,6 +15,43 @@ from app.models.user import User
 security = HTTPBearer()
 
 
+@dataclass(frozen=True)
+class Principal:
+    """Lightweight authenticated identity for routes that only need the user's ID"""
+    id: uuid.UUID
+    username: str
+    is_verified: bool
+
+
+# Principals keyed by (user_id, token)
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(user_id: uuid.UUID | str) -> None:
+    """
+    Drop cached principals for a user
+    
+    Call after changing anything a Principal carries or that should force
+    re-authentication (password, verification, deletion).
+    
+    Args:
+        user_id: User's ID
+    """
+    user_id = str(user_id)
+    principal_cache.discard_where(lambda key: key[0] == user_id)
+
+
+def _credentials_exception(detail: str = "Invalid authentication credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -27,37 +69,66 @@ async def get_current_user(
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
-    payload = decode_access_token(token)
+    payload = decode_access_token(credentials.credentials)
+    
+    if payload is None or payload.get("sub") is None:
+        raise _credentials_exception()
     
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    result = await db.execute(select(User).where(User.id == user_id))
+    result = await db.execute(select(User).where(User.id == payload["sub"]))
     user = result.scalar_one_or_none()
     
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception("User not found")
     
     return user
 
 
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Dependency to get the current authenticated principal
+    
+    Like get_current_user, but served from the principal cache when
+    possible and loading only the columns a Principal carries otherwise.
+    
+    Args:
+        credentials: Bearer token from request
+        db: Database session
+    
+    Returns:
+        Current principal
+    
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    token = credentials.credentials
+    payload = decode_access_token(token)
+    
+    if payload is None or payload.get("sub") is None:
+        raise _credentials_exception()
+    
+    user_id: str = payload["sub"]
+    cache_key = (user_id, token)
+    principal = principal_cache.get(cache_key)
+    if principal is not None:
+        return principal
+    
+    result = await db.execute(
+        select(User.id, User.username, User.is_verified).where(User.id == user_id)
+    )
+    row = result.one_or_none()
+    
+    if row is None:
+        raise _credentials_exception("User not found")
+    
+    principal = Principal(id=row.id, username=row.username, is_verified=row.is_verified)
+    principal_cache.set(cache_key, principal)
+    
+    return principal
+
+
 async def get_verified_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -81,3 +152,22 @@ async def get_verified_user(
     #     )
     
     return current_user
+
+
+async def get_verified_principal(
+    principal: Principal = Depends(get_current_principal)
+) -> Principal:
+    """
+    Dependency to get verified principal
+    
+    Args:
+        principal: Current authenticated principal
+    
+    Returns:
+        Verified principal
+    
+    Raises:
+        HTTPException: If email not verified
+    """
+    # Verification check bypassed, matching get_verified_user
+    return principal
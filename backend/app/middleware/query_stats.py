@@ -0,0 +1,41 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.query_stats import RequestQueryStats, current_query_stats, query_stats
+
+
+class QueryStatsMiddleware:
+    """
+    Attributes SQL statements to the request that issued them
+
+    Adds a Server-Timing header (query count, total and slowest statement
+    time) and folds the request into per-route totals for /metrics.
+    Queries run while a streaming body is sent are counted in the route
+    totals but not in the header, which has already gone out.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(path=f"{scope['method']} {scope['path']}")
+        reset = current_query_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing:
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(reset)
+            # Route template (e.g. /api/tasks/{task_id}) keeps the metrics bounded
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            query_stats.finish_request(f"{scope['method']} {path}", stats)
@@ -1,13 +1,22 @@
-from app.models.gamification import Achievement, UserAchievement, UserStats
-from app.models.task import PriorityEnum, StatusEnum, Task
+from app.models.calendar_sync_job import CalendarSyncJob, SyncJobStatusEnum
+from app.models.email_outbox import EmailOutbox, EmailStatusEnum
+from app.models.gamification import Achievement, UserAchievement, UserPeriodXP, UserStats, XPEvent
+from app.models.task import PriorityEnum, StatusEnum, Task, TaskTombstone
 from app.models.user import User
 
 __all__ = [
     "User",
     "Task",
+    "TaskTombstone",
     "PriorityEnum",
     "StatusEnum",
     "UserStats",
     "Achievement",
     "UserAchievement",
+    "UserPeriodXP",
+    "XPEvent",
+    "EmailOutbox",
+    "EmailStatusEnum",
+    "CalendarSyncJob",
+    "SyncJobStatusEnum",
 ]
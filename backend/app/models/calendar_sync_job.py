@@ -0,0 +1,59 @@
+"""Google Calendar Background Sync Job Model"""
+import enum
+import uuid
+from datetime import datetime
+
+from sqlalchemy import ARRAY, Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, Text, false
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class SyncJobStatusEnum(str, enum.Enum):
+    """Calendar sync job lifecycle"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+# Statuses that count against the one-active-sync-per-user limit
+ACTIVE_SYNC_STATUSES = (SyncJobStatusEnum.QUEUED, SyncJobStatusEnum.RUNNING)
+
+
+class CalendarSyncJob(Base):
+    """A calendar sync run and its progress, readable from any app worker"""
+    __tablename__ = "calendar_sync_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    task_ids = Column(ARRAY(UUID(as_uuid=True)), nullable=True)  # None = all tasks with due dates
+    automatic = Column(Boolean, default=False, server_default=false(), nullable=False)  # Queued by auto-sync
+
+    status = Column(Enum(SyncJobStatusEnum), default=SyncJobStatusEnum.QUEUED, nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+    processed = Column(Integer, default=0, nullable=False)
+    created = Column(Integer, default=0, nullable=False)
+    updated = Column(Integer, default=0, nullable=False)
+    deleted = Column(Integer, default=0, nullable=False)
+    skipped = Column(Integer, default=0, nullable=False)  # Unchanged since the last sync
+    errors = Column(Integer, default=0, nullable=False)
+    error_message = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Bumped with each progress write
+
+    # At most one queued or running sync per user, across all app workers
+    __table_args__ = (
+        Index(
+            "ux_calendar_sync_jobs_user_active",
+            "user_id",
+            unique=True,
+            postgresql_where=status.in_(ACTIVE_SYNC_STATUSES),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<CalendarSyncJob {self.id} ({self.status.value})>"
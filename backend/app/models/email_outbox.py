@@ -0,0 +1,44 @@
+"""Transactional Email Outbox Model"""
+import enum
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class EmailStatusEnum(str, enum.Enum):
+    """Outbox delivery status"""
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class EmailOutbox(Base):
+    """Email queued in the same transaction as the change that triggered it"""
+    __tablename__ = "email_outbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html_content = Column(Text, nullable=False)
+
+    # Delivery tracking
+    status = Column(Enum(EmailStatusEnum), default=EmailStatusEnum.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    # The sender polls for due pending messages and prunes old sent ones
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+        Index("ix_email_outbox_status_sent_at", "status", "sent_at"),
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.subject} -> {self.to_email} ({self.status.value})>"
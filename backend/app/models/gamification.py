@@ -1,7 +1,20 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    UniqueConstraint,
+    event,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -34,10 +47,73 @@ class UserStats(Base):
     # Relationships
     user = relationship("User", back_populates="stats")
     
+    # All-time leaderboard reads users in XP order
+    __table_args__ = (
+        Index("ix_user_stats_total_xp_desc", total_xp.desc()),
+    )
+    
     def __repr__(self):
         return f"<UserStats Level {self.level}, XP {self.total_xp}>"
 
 
+class UserPeriodXP(Base):
+    """XP earned by a user within a calendar period (day, week or month), rolled up from xp_events"""
+    __tablename__ = "user_period_xp"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    period = Column(String(10), primary_key=True)  # 'day', 'week', 'month'
+    period_start = Column(Date, primary_key=True)
+    xp = Column(Integer, default=0, nullable=False)
+    
+    # Periodic leaderboards read one period in XP order
+    __table_args__ = (
+        Index("ix_user_period_xp_period_xp", "period", "period_start", xp.desc()),
+    )
+    
+    def __repr__(self):
+        return f"<UserPeriodXP {self.period} {self.period_start}: {self.xp}>"
+
+
+xp_event_id_seq = Sequence("xp_event_id_seq", metadata=Base.metadata)
+
+
+class XPEvent(Base):
+    """
+    Append-only ledger of XP awards
+    
+    Range-partitioned by month on created_at; monthly partitions are
+    created ahead of time (at startup and periodically), and a default partition catches
+    anything outside them.
+    """
+    __tablename__ = "xp_events"
+    
+    # The partition key must be part of the primary key
+    id = Column(BigInteger, xp_event_id_seq, server_default=xp_event_id_seq.next_value(), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    
+    xp = Column(Integer, nullable=False)
+    source = Column(String(20), nullable=False)  # 'task', 'achievement'
+    achievement_id = Column(UUID(as_uuid=True), ForeignKey("achievements.id", ondelete="SET NULL"), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_xp_events_user_created", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    
+    def __repr__(self):
+        return f"<XPEvent {self.source} +{self.xp}>"
+
+
+event.listen(
+    XPEvent.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS xp_events_default PARTITION OF xp_events DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+
 class Achievement(Base):
     """Achievement/Badge definitions"""
     __tablename__ = "achievements"
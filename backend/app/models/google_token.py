@@ -2,7 +2,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Text
+from sqlalchemy import Column, DateTime, ForeignKey, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.core.database import Base
@@ -17,5 +17,14 @@ class GoogleToken(Base):
     refresh_token = Column(Text, nullable=False)
     access_token = Column(Text, nullable=True)
     token_expiry = Column(DateTime, nullable=True)
+
+    # Inbound sync: Calendar nextSyncToken for the primary calendar
+    sync_token = Column(Text, nullable=True)
+
+    # Push channel that notifies us of event changes
+    channel_id = Column(String(64), nullable=True, unique=True)
+    channel_resource_id = Column(String(255), nullable=True)
+    channel_token = Column(String(64), nullable=True)
+    channel_expiration = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -2,9 +2,23 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import ARRAY, Column, DateTime, Enum, ForeignKey, String, Text
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    ARRAY,
+    DDL,
+    BigInteger,
+    Column,
+    Computed,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Sequence,
+    String,
+    Text,
+    event,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 
 from app.core.database import Base
 
@@ -22,6 +36,11 @@ class StatusEnum(str, enum.Enum):
     COMPLETED = "completed"
 
 
+# Global, monotonically increasing change counter shared by tasks and their
+# tombstones; it drives delta sync (GET /api/tasks/changes)
+task_change_seq = Sequence("task_change_seq", metadata=Base.metadata)
+
+
 class Task(Base):
     """Task model with all properties"""
     __tablename__ = "tasks"
@@ -38,14 +57,129 @@ class Task(Base):
     tags = Column(ARRAY(String), nullable=True, default=[])
     google_event_id = Column(String(255), nullable=True)
     
+    # Calendar sync: hash of the last event body sent, so unchanged tasks are skipped
+    google_event_fingerprint = Column(String(64), nullable=True)
+    last_synced_at = Column(DateTime, nullable=True)
+    
     # Dates
     due_date = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Delta sync: bumped on every insert and update
+    change_seq = Column(
+        BigInteger,
+        task_change_seq,
+        server_default=task_change_seq.next_value(),
+        onupdate=task_change_seq.next_value(),
+        nullable=False,
+    )
+    
+    # Full-text search document (title > tags/category > description).
+    # Deferred so regular task reads never load it.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', task_tags_text(tags) || ' ' || coalesce(category, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C')",
+            persisted=True,
+        ),
+    ))
+    
     # Relationships
     user = relationship("User", back_populates="tasks")
     
+    __table_args__ = (
+        # Composite index backing keyset pagination of a user's task list
+        Index("ix_tasks_user_created_id", "user_id", "created_at", "id"),
+        # Delta sync scans a user's changes in sequence order
+        Index("ix_tasks_user_change_seq", "user_id", "change_seq"),
+        # Completion heatmap aggregates a user's recent completed_at values
+        Index("ix_tasks_user_completed_at", "user_id", "completed_at"),
+        # Inbound calendar sync maps changed events back to tasks
+        Index(
+            "ix_tasks_user_google_event_id",
+            "user_id",
+            "google_event_id",
+            postgresql_where=google_event_id.isnot(None),
+        ),
+        # Full-text and trigram (typo-tolerant) search indexes
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_tasks_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
+    
     def __repr__(self):
         return f"<Task {self.title} ({self.status.value})>"
+
+
+class TaskTombstone(Base):
+    """Record of a deleted task, kept so delta sync can report deletions"""
+    __tablename__ = "task_tombstones"
+    
+    task_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    change_seq = Column(
+        BigInteger,
+        task_change_seq,
+        server_default=task_change_seq.next_value(),
+        nullable=False,
+    )
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Calendar event still to be removed by the next calendar sync
+    google_event_id = Column(String(255), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_task_tombstones_user_change_seq", "user_id", "change_seq"),
+    )
+    
+    def __repr__(self):
+        return f"<TaskTombstone {self.task_id}>"
+
+
+# Generated columns may only call IMMUTABLE functions, and array_to_string is
+# only STABLE, so tags are flattened through an immutable wrapper.
+PG_TRGM_DDL = DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+TASK_TAGS_TEXT_DDL = DDL(
+    "CREATE OR REPLACE FUNCTION task_tags_text(tags text[]) RETURNS text "
+    "LANGUAGE sql IMMUTABLE AS $$ SELECT coalesce(array_to_string(tags, ' '), '') $$"
+)
+for ddl in (PG_TRGM_DDL, TASK_TAGS_TEXT_DDL):
+    event.listen(Task.__table__, "before_create", ddl.execute_if(dialect="postgresql"))
+
+# Delta sync hands out change_seq values as resume tokens, so a user's
+# values must become visible in order: a transaction must not commit a
+# lower number after a higher one was already readable. Writers take a
+# per-user transaction lock before drawing the number, so a user's writes
+# are numbered in commit order. Updates that pin change_seq to its old
+# value (calendar bookkeeping) skip both.
+TASK_CHANGE_SEQ_FUNCTION_DDL = DDL(
+    "CREATE OR REPLACE FUNCTION task_change_seq_assign() RETURNS trigger LANGUAGE plpgsql AS $$ "
+    "BEGIN "
+    "IF TG_OP = 'UPDATE' AND NEW.change_seq IS NOT DISTINCT FROM OLD.change_seq THEN RETURN NEW; END IF; "
+    "PERFORM pg_advisory_xact_lock(hashtext('task_change_seq'), hashtext(NEW.user_id::text)); "
+    "NEW.change_seq := nextval('task_change_seq'); "
+    "RETURN NEW; "
+    "END $$"
+)
+CHANGE_SEQ_TABLES = (Task.__table__, TaskTombstone.__table__)
+
+
+def change_seq_trigger_ddl(table_name: str) -> DDL:
+    """Trigger numbering a table's writes through task_change_seq_assign()"""
+    return DDL(
+        f"CREATE OR REPLACE TRIGGER {table_name}_change_seq BEFORE INSERT OR UPDATE ON {table_name} "
+        "FOR EACH ROW EXECUTE FUNCTION task_change_seq_assign()"
+    )
+
+
+for table in CHANGE_SEQ_TABLES:
+    event.listen(table, "before_create", TASK_CHANGE_SEQ_FUNCTION_DDL.execute_if(dialect="postgresql"))
+    event.listen(table, "after_create", change_seq_trigger_ddl(table.name).execute_if(dialect="postgresql"))
@@ -5,13 +5,15 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.security import create_access_token, generate_verification_token, hash_password, verify_password
-from app.middleware.auth import get_verified_user
+from app.core.security import create_access_token, generate_verification_token
+from app.middleware.auth import get_verified_user, invalidate_principal
 from app.models.gamification import UserStats
 from app.models.user import User
 from app.schemas.auth import PasswordResetConfirm, PasswordResetRequest, TokenResponse
 from app.schemas.user import UserCreate, UserLogin, UserResponse
-from app.services.email import send_password_reset_email, send_verification_email
+from app.services.email import queue_password_reset_email, queue_verification_email
+from app.services.email_outbox import email_outbox_worker
+from app.services.password_hashing import password_hasher
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -22,7 +24,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     Register a new user
     
     - Creates user account
-    - Sends verification email
+    - Queues verification email
     - Returns user data
     """
     # Check if username exists
@@ -46,7 +48,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     user = User(
         username=user_data.username,
         email=user_data.email,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await password_hasher.hash(user_data.password),
         verification_token=verification_token,
         is_verified=True,
     )
@@ -58,11 +60,12 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     stats = UserStats(user_id=user.id)
     db.add(stats)
     
+    # Queue verification email; the outbox sender delivers it after commit
+    queue_verification_email(db, user.email, user.username, verification_token)
+    
     await db.commit()
     await db.refresh(user)
-    
-    # Send verification email
-    await send_verification_email(user.email, user.username, verification_token)
+    email_outbox_worker.notify()
     
     return user
 
@@ -90,6 +93,7 @@ async def verify_email(token: str, db: AsyncSession = Depends(get_db)):
     user.verification_token = None
     
     await db.commit()
+    invalidate_principal(user.id)
     
     return {"message": "Email verified successfully"}
 
@@ -100,19 +104,31 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     Login and get access token
     
     - Validates credentials
+    - Rehashes the password if Argon2 parameters changed
     - Returns JWT token
     """
     # Find user by email
     result = await db.execute(select(User).where(User.email == credentials.email))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    is_valid, new_hash = False, None
+    if user:
+        is_valid, new_hash = await password_hasher.verify_and_update(
+            credentials.password, user.hashed_password
+        )
+    
+    if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Transparently upgrade hashes made with outdated Argon2 parameters
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
     # Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
     
@@ -135,7 +151,7 @@ async def forgot_password(request: PasswordResetRequest, db: AsyncSession = Depe
     """
     Request password reset
     
-    - Sends password reset email
+    - Queues password reset email
     """
     result = await db.execute(select(User).where(User.email == request.email))
     user = result.scalar_one_or_none()
@@ -149,10 +165,11 @@ async def forgot_password(request: PasswordResetRequest, db: AsyncSession = Depe
     user.reset_token = reset_token
     user.reset_token_expires = datetime.utcnow() + timedelta(hours=1)
     
-    await db.commit()
+    # Queue reset email; the outbox sender delivers it after commit
+    queue_password_reset_email(db, user.email, user.username, reset_token)
     
-    # Send reset email
-    await send_password_reset_email(user.email, user.username, reset_token)
+    await db.commit()
+    email_outbox_worker.notify()
     
     return {"message": "If the email exists, a password reset link has been sent"}
 
@@ -177,10 +194,11 @@ async def reset_password(request: PasswordResetConfirm, db: AsyncSession = Depen
         )
     
     # Update password
-    user.hashed_password = hash_password(request.new_password)
+    user.hashed_password = await password_hasher.hash(request.new_password)
     user.reset_token = None
     user.reset_token_expires = None
     
     await db.commit()
+    invalidate_principal(user.id)
     
     return {"message": "Password reset successfully"}
@@ -1,23 +1,25 @@
 """Google Calendar Integration Routes"""
+import hmac
+import secrets
+import uuid
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
-from sqlalchemy import and_, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.middleware.auth import get_verified_user
+from app.middleware.auth import Principal, get_verified_principal
+from app.models.calendar_sync_job import CalendarSyncJob
 from app.models.google_token import GoogleToken
-from app.models.task import Task
-from app.models.user import User
-from app.services.google_calendar import (
-    exchange_code,
-    get_auth_url,
-    get_credentials,
-    sync_tasks_to_calendar,
-)
+from app.services.calendar_client import CalendarNotConnected, calendar_clients
+from app.services.calendar_inbound import calendar_pulls, pull_calendar_changes
+from app.services.calendar_sync import SyncAlreadyRunning, calendar_sync_runner
+from app.services.google_api import GoogleAPIError, google_api
+from app.services.google_calendar import exchange_code, get_auth_url
 
 router = APIRouter(prefix="/calendar", tags=["Calendar"])
 
@@ -25,24 +27,65 @@ router = APIRouter(prefix="/calendar", tags=["Calendar"])
 # --- Request/Response Schemas ---
 
 class SyncRequest(BaseModel):
-    task_ids: list[str] | None = None  # If None, sync all tasks with due dates
+    task_ids: list[uuid.UUID] | None = None  # If None, sync all tasks with due dates
 
 
 class SyncResponse(BaseModel):
+    job_id: uuid.UUID
+    status: str
+    total: int
+    processed: int
     created: int
+    updated: int
+    deleted: int
+    skipped: int
     errors: int
-    message: str
+    error_message: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+def _sync_response(job: CalendarSyncJob) -> SyncResponse:
+    return SyncResponse(
+        job_id=job.id,
+        status=job.status.value,
+        total=job.total or 0,
+        processed=job.processed or 0,
+        created=job.created or 0,
+        updated=job.updated or 0,
+        deleted=job.deleted or 0,
+        skipped=job.skipped or 0,
+        errors=job.errors or 0,
+        error_message=job.error_message,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
 
 
 class CalendarStatusResponse(BaseModel):
     connected: bool
 
 
+class PullResponse(BaseModel):
+    fetched: int
+    applied: int
+    kept_local: int
+    unchanged: int
+    ignored: int
+
+
+class WatchResponse(BaseModel):
+    channel_id: str
+    expiration: datetime | None = None
+
+
 # --- Routes ---
 
 @router.get("/auth-url")
 async def get_google_auth_url(
-    current_user: User = Depends(get_verified_user),
+    current_user: Principal = Depends(get_verified_principal),
 ):
     """
     Get Google OAuth2 authorization URL.
@@ -85,7 +128,7 @@ async def google_callback(
 @router.post("/connect")
 async def connect_google_calendar(
     code: str = Query(..., description="Authorization code from Google OAuth"),
-    current_user: User = Depends(get_verified_user),
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -93,7 +136,7 @@ async def connect_google_calendar(
     Called by frontend after OAuth redirect.
     """
     try:
-        tokens = exchange_code(code)
+        tokens = await exchange_code(code)
 
 
         if not tokens.get("refresh_token"):
@@ -114,6 +157,8 @@ async def connect_google_calendar(
             existing_token.refresh_token = tokens["refresh_token"]
             existing_token.access_token = tokens.get("access_token")
             existing_token.token_expiry = tokens.get("token_expiry")
+            # Possibly another Google account; start inbound sync over
+            existing_token.sync_token = None
         else:
             google_token = GoogleToken(
                 user_id=current_user.id,
@@ -124,6 +169,7 @@ async def connect_google_calendar(
             db.add(google_token)
 
         await db.commit()
+        calendar_clients.invalidate(current_user.id)
 
         return {"message": "Google Calendar connected successfully"}
 
@@ -139,7 +185,7 @@ async def connect_google_calendar(
 
 @router.get("/status", response_model=CalendarStatusResponse)
 async def get_calendar_status(
-    current_user: User = Depends(get_verified_user),
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Check if user has connected Google Calendar"""
@@ -150,73 +196,66 @@ async def get_calendar_status(
     return {"connected": token is not None}
 
 
-@router.post("/sync", response_model=SyncResponse)
+@router.post("/sync", response_model=SyncResponse, status_code=status.HTTP_202_ACCEPTED)
 async def sync_to_google_calendar(
     sync_data: SyncRequest,
-    current_user: User = Depends(get_verified_user),
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Sync tasks to Google Calendar.
+    Start syncing tasks to Google Calendar in the background.
     If task_ids provided, syncs only those tasks.
     Otherwise, syncs all tasks with due dates.
+    Returns the job immediately; poll GET /sync/{job_id} for progress.
+    Only one sync per user may be queued or running at a time.
     """
-    # Get user's Google token
     result = await db.execute(
-        select(GoogleToken).where(GoogleToken.user_id == current_user.id)
+        select(GoogleToken.id).where(GoogleToken.user_id == current_user.id)
     )
-    google_token = result.scalar_one_or_none()
-
-    if not google_token:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Google Calendar not connected. Please connect first.",
         )
 
-    # Build task query
-    query = select(Task).where(
-        and_(
-            Task.user_id == current_user.id,
-            Task.due_date.isnot(None),
+    try:
+        job = await calendar_sync_runner.submit(current_user.id, sync_data.task_ids, db)
+    except SyncAlreadyRunning as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(e), "job_id": str(e.job_id) if e.job_id else None},
         )
-    )
-
-    if sync_data.task_ids:
-        query = query.where(Task.id.in_(sync_data.task_ids))
 
-    result = await db.execute(query)
-    tasks = result.scalars().all()
+    return _sync_response(job)
 
 
-    # Build credentials and sync
-    credentials = get_credentials(
-        access_token=google_token.access_token or "",
-        refresh_token=google_token.refresh_token,
-        token_expiry=google_token.token_expiry,
+@router.get("/sync/{job_id}", response_model=SyncResponse)
+async def get_sync_job(
+    job_id: uuid.UUID,
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get progress and counts of a calendar sync job"""
+    result = await db.execute(
+        select(CalendarSyncJob).where(
+            CalendarSyncJob.id == job_id,
+            CalendarSyncJob.user_id == current_user.id,
+        )
     )
+    job = result.scalar_one_or_none()
 
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sync job not found",
+        )
 
-    sync_result = sync_tasks_to_calendar(tasks, credentials)
-
-
-    # Commit changes (including updated google_event_ids and potentially refreshed tokens)
-    if credentials.token != google_token.access_token:
-        google_token.access_token = credentials.token
-        google_token.token_expiry = credentials.expiry
-    
-    await db.commit()
-
-
-    return SyncResponse(
-        created=sync_result["created"],
-        errors=sync_result["errors"],
-        message=f"Synced {sync_result['created']} tasks to Google Calendar",
-    )
+    return _sync_response(job)
 
 
 @router.delete("/disconnect")
 async def disconnect_google_calendar(
-    current_user: User = Depends(get_verified_user),
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Disconnect Google Calendar by removing stored tokens"""
@@ -226,7 +265,132 @@ async def disconnect_google_calendar(
     token = result.scalar_one_or_none()
 
     if token:
+        if token.channel_id:
+            await _stop_channel(current_user.id, token, db)
         await db.delete(token)
         await db.commit()
+        calendar_clients.invalidate(current_user.id)
 
     return {"message": "Google Calendar disconnected"}
+
+
+@router.post("/pull", response_model=PullResponse)
+async def pull_from_google_calendar(
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Apply edits made in Google Calendar to tasks.
+    Fetches only events changed since the last pull (Calendar syncToken).
+    Event title and start map onto task title and due date; when both
+    sides changed, the more recently updated one wins.
+    """
+    try:
+        counts = await pull_calendar_changes(current_user.id, db)
+    except CalendarNotConnected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Google Calendar not connected. Please connect first.",
+        )
+    except GoogleAPIError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Google Calendar error: {e}",
+        )
+
+    return counts
+
+
+async def _stop_channel(user_id: uuid.UUID, token: GoogleToken, db: AsyncSession) -> None:
+    """Best-effort stop of the user's push channel"""
+    try:
+        credentials = await calendar_clients.get_credentials(user_id, db)
+        await google_api.stop_channel(credentials.token, token.channel_id, token.channel_resource_id)
+    except Exception as e:
+        print(f"Error stopping calendar push channel: {e}")
+    token.channel_id = None
+    token.channel_resource_id = None
+    token.channel_token = None
+    token.channel_expiration = None
+
+
+@router.post("/watch", response_model=WatchResponse)
+async def watch_google_calendar(
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Open (or renew) a push channel so Google notifies us of event changes.
+    Notifications trigger a background pull. Channels expire; call again
+    before the returned expiration.
+    """
+    if not settings.GOOGLE_CALENDAR_WEBHOOK_URL:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Push notifications are not configured",
+        )
+
+    result = await db.execute(
+        select(GoogleToken).where(GoogleToken.user_id == current_user.id)
+    )
+    token = result.scalar_one_or_none()
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Google Calendar not connected. Please connect first.",
+        )
+
+    if token.channel_id:
+        await _stop_channel(current_user.id, token, db)
+
+    channel_id = uuid.uuid4().hex
+    channel_token = secrets.token_urlsafe(32)
+    try:
+        credentials = await calendar_clients.get_credentials(current_user.id, db)
+        channel = await google_api.watch_events(
+            credentials.token, channel_id, settings.GOOGLE_CALENDAR_WEBHOOK_URL, channel_token
+        )
+    except GoogleAPIError as e:
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Google Calendar error: {e}",
+        )
+
+    token.channel_id = channel_id
+    token.channel_token = channel_token
+    token.channel_resource_id = channel.get("resourceId")
+    token.channel_expiration = (
+        datetime.utcfromtimestamp(int(channel["expiration"]) / 1000) if channel.get("expiration") else None
+    )
+    await db.commit()
+
+    return WatchResponse(channel_id=channel_id, expiration=token.channel_expiration)
+
+
+@router.post("/webhook", status_code=status.HTTP_204_NO_CONTENT)
+async def google_calendar_webhook(
+    x_goog_channel_id: str = Header(...),
+    x_goog_resource_state: str = Header(...),
+    x_goog_channel_token: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Push notification endpoint called by Google (no user auth).
+    The channel token issued in /watch authenticates the call; the pull
+    runs in the background so Google gets an immediate answer.
+    """
+    result = await db.execute(
+        select(GoogleToken.user_id, GoogleToken.channel_token).where(GoogleToken.channel_id == x_goog_channel_id)
+    )
+    channel = result.one_or_none()
+
+    if channel is None or not hmac.compare_digest(channel.channel_token or "", x_goog_channel_token or ""):
+        # Unknown or stopped channel; 404 makes Google stop retrying
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown channel")
+
+    # 'sync' only confirms the channel was created
+    if x_goog_resource_state != "sync":
+        calendar_pulls.request(channel.user_id)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
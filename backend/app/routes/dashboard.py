@@ -0,0 +1,154 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.middleware.auth import Principal, get_verified_principal
+from app.models.gamification import Achievement, UserAchievement, UserStats
+from app.models.task import PriorityEnum, StatusEnum, Task
+from app.models.user import User
+from app.schemas.dashboard import DashboardResponse, TaskCounts
+from app.schemas.gamification import AchievementResponse, UserStatsResponse
+from app.schemas.task import TaskResponse
+from app.schemas.user import UserResponse
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+@router.get("", response_model=DashboardResponse)
+async def get_dashboard(
+    limit: int = Query(5, ge=1, le=50),
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get everything the dashboard page shows in one request
+    
+    - Profile, gamification stats and achievements with unlock state
+    - Task counts by status and priority, plus overdue pending tasks
+    - Next `limit` pending tasks by due date and last `limit` completed tasks
+    - Four queries on one session, authenticated via the cached principal
+    """
+    now = datetime.utcnow()
+    
+    # Profile and stats
+    result = await db.execute(
+        select(User, UserStats)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(User.id == current_user.id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    user, stats = row
+    
+    if stats is None:
+        # Create stats if not exists
+        stats = UserStats(user_id=user.id)
+        db.add(stats)
+        await db.commit()
+        await db.refresh(stats)
+    
+    # Achievement catalog with this user's unlocks
+    result = await db.execute(
+        select(Achievement, UserAchievement.unlocked_at)
+        .outerjoin(
+            UserAchievement,
+            and_(
+                UserAchievement.achievement_id == Achievement.id,
+                UserAchievement.user_id == current_user.id,
+            ),
+        )
+        .order_by(Achievement.requirement_type, Achievement.requirement_value)
+    )
+    achievements = [
+        AchievementResponse(
+            id=achievement.id,
+            name=achievement.name,
+            description=achievement.description,
+            badge_icon=achievement.badge_icon,
+            requirement_type=achievement.requirement_type,
+            requirement_value=achievement.requirement_value,
+            xp_reward=achievement.xp_reward,
+            unlocked=unlocked_at is not None,
+            unlocked_at=unlocked_at,
+        )
+        for achievement, unlocked_at in result.all()
+    ]
+    
+    # Task counts per (status, priority), folded into both breakdowns
+    result = await db.execute(
+        select(
+            Task.status,
+            Task.priority,
+            func.count(),
+            func.count().filter(Task.due_date < now),
+        )
+        .where(Task.user_id == current_user.id)
+        .group_by(Task.status, Task.priority)
+    )
+    by_status = {task_status.value: 0 for task_status in StatusEnum}
+    by_priority = {priority.value: 0 for priority in PriorityEnum}
+    overdue = 0
+    for task_status, priority, count, past_due in result.all():
+        by_status[task_status.value] += count
+        by_priority[priority.value] += count
+        if task_status == StatusEnum.PENDING:
+            overdue += past_due
+    
+    # Upcoming and recently completed tasks in one query
+    upcoming = (
+        select(Task.id)
+        .where(
+            Task.user_id == current_user.id,
+            Task.status == StatusEnum.PENDING,
+            Task.due_date.is_not(None),
+        )
+        .order_by(Task.due_date)
+        .limit(limit)
+        .subquery()
+    )
+    recent = (
+        select(Task.id)
+        .where(
+            Task.user_id == current_user.id,
+            Task.status == StatusEnum.COMPLETED,
+        )
+        # Tasks completed through PUT /tasks/{id} may have no completed_at
+        .order_by(Task.completed_at.desc().nulls_last())
+        .limit(limit)
+        .subquery()
+    )
+    result = await db.execute(
+        select(Task).where(or_(Task.id.in_(select(upcoming.c.id)), Task.id.in_(select(recent.c.id))))
+    )
+    tasks = result.scalars().all()
+    upcoming_tasks = sorted(
+        (task for task in tasks if task.status == StatusEnum.PENDING),
+        key=lambda task: task.due_date,
+    )
+    recently_completed = sorted(
+        (task for task in tasks if task.status == StatusEnum.COMPLETED),
+        key=lambda task: (task.completed_at is not None, task.completed_at or datetime.min),
+        reverse=True,
+    )
+    
+    return DashboardResponse(
+        user=UserResponse.model_validate(user),
+        stats=UserStatsResponse.model_validate(stats),
+        achievements=achievements,
+        achievements_unlocked=sum(achievement.unlocked for achievement in achievements),
+        task_counts=TaskCounts(
+            total=sum(by_status.values()),
+            overdue=overdue,
+            by_status=by_status,
+            by_priority=by_priority,
+        ),
+        upcoming_tasks=[TaskResponse.model_validate(task) for task in upcoming_tasks],
+        recently_completed=[TaskResponse.model_validate(task) for task in recently_completed],
+    )
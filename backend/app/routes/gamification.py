@@ -1,27 +1,61 @@
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from datetime import date, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.middleware.auth import get_verified_user
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.middleware.auth import Principal, get_verified_principal
 from app.models.gamification import Achievement, UserAchievement, UserStats
+from app.models.task import PriorityEnum
 from app.models.user import User
-from app.schemas.gamification import AchievementResponse, UserStatsResponse
+from app.schemas.gamification import (
+    AchievementResponse,
+    AnalyticsResponse,
+    CompletionRate,
+    HeatmapDay,
+    LeaderboardEntry,
+    LeaderboardResponse,
+    UserStatsResponse,
+    XPHistoryPoint,
+    XPHistoryResponse,
+)
+from app.services.analytics import CompletionCounts, get_user_analytics, heatmap_start
+from app.services.leaderboard import leaderboards
+from app.services.xp_ledger import get_xp_history
+
+# Default history window per granularity, and the longest allowed range
+HISTORY_DEFAULT_DAYS = {"day": 30, "week": 12 * 7, "month": 365}
+HISTORY_MAX_DAYS = 3 * 365
 
 router = APIRouter(prefix="/gamification", tags=["Gamification"])
 
 
 @router.get("/stats", response_model=UserStatsResponse)
 async def get_user_stats(
-    current_user: User = Depends(get_verified_user),
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get user's gamification stats
     
     - Returns XP, level, streaks, tasks completed
+    - Honors If-None-Match with 304 Not Modified
     """
+    # Every stats write bumps updated_at, so it is the validator
+    result = await db.execute(
+        select(UserStats.updated_at).where(UserStats.user_id == current_user.id)
+    )
+    updated_at = result.scalar_one_or_none()
+    if updated_at is not None:
+        etag = make_etag("stats", current_user.id, updated_at.isoformat())
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
     result = await db.execute(
         select(UserStats).where(UserStats.user_id == current_user.id)
     )
@@ -34,12 +68,16 @@ async def get_user_stats(
         await db.commit()
         await db.refresh(stats)
     
+    set_etag(response, make_etag("stats", current_user.id, stats.updated_at.isoformat()))
+    
     return stats
 
 
 @router.get("/achievements", response_model=list[AchievementResponse])
 async def get_achievements(
-    current_user: User = Depends(get_verified_user),
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -47,7 +85,23 @@ async def get_achievements(
     
     - Returns all achievements
     - Indicates which are unlocked
+    - Honors If-None-Match with 304 Not Modified
     """
+    # Catalog rows and unlocks are only ever added, so counts plus the
+    # newest timestamps change whenever the response would
+    result = await db.execute(
+        select(
+            select(func.count(Achievement.id), func.max(Achievement.created_at)).subquery(),
+            select(func.count(UserAchievement.id), func.max(UserAchievement.unlocked_at))
+            .where(UserAchievement.user_id == current_user.id)
+            .subquery(),
+        )
+    )
+    etag = make_etag("achievements", current_user.id, *result.one())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
     # Get all achievements
     result = await db.execute(select(Achievement))
     all_achievements = result.scalars().all()
@@ -83,3 +137,136 @@ async def get_achievements(
         )
     
     return achievements_response
+
+
+@router.get("/leaderboard", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    period: str = Query("all_time", pattern="^(all_time|weekly|monthly)$"),
+    limit: int = Query(10, ge=1, le=100),
+    neighbors: int = Query(2, ge=0, le=25),
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the XP leaderboard
+    
+    - period: all_time, weekly (Monday-based) or monthly
+    - Returns the top `limit` users, the caller's rank and the users
+      ranked `neighbors` places around the caller
+    - Tied users share a rank
+    """
+    board = await leaderboards.get(period)
+    
+    top = board.entries(0, limit)
+    position = board.position_of(current_user.id)
+    around = []
+    if position is not None:
+        around = board.entries(position - neighbors, position + neighbors + 1)
+    
+    # Resolve usernames for everyone shown in one query
+    user_ids = {user_id for _, user_id, _ in top + around}
+    usernames = {}
+    if user_ids:
+        result = await db.execute(select(User.id, User.username).where(User.id.in_(user_ids)))
+        usernames = dict(result.all())
+    
+    def to_entries(rows: list[tuple]) -> list[LeaderboardEntry]:
+        return [
+            LeaderboardEntry(rank=rank, user_id=user_id, username=usernames[user_id], xp=xp)
+            for rank, user_id, xp in rows
+            if user_id in usernames
+        ]
+    
+    me = next((entry for entry in to_entries(around) if entry.user_id == current_user.id), None)
+    
+    return LeaderboardResponse(
+        period=period,
+        period_start=board.period_start,
+        total_users=len(board),
+        top=to_entries(top),
+        me=me,
+        neighbors=to_entries(around),
+    )
+
+
+@router.get("/xp-history", response_model=XPHistoryResponse)
+async def get_xp_history_series(
+    period: str = Query("day", pattern="^(day|week|month)$"),
+    start: date | None = None,
+    end: date | None = None,
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get XP earned over time
+    
+    - period: day, week (Monday-based) or month buckets
+    - start/end: date range (defaults to a recent window ending today)
+    - Served from the rollup table; periods without XP are returned as 0
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=HISTORY_DEFAULT_DAYS[period] - 1)
+    
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end"
+        )
+    if (end - start).days > HISTORY_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {HISTORY_MAX_DAYS} days"
+        )
+    
+    series = await get_xp_history(current_user.id, period, start, end, db)
+    
+    return XPHistoryResponse(
+        period=period,
+        start=series[0][0],
+        end=end,
+        total_xp=sum(xp for _, xp in series),
+        points=[XPHistoryPoint(period_start=period_start, xp=xp) for period_start, xp in series],
+    )
+
+
+def _completion_rates(counts: dict[str | PriorityEnum | None, CompletionCounts]) -> list[CompletionRate]:
+    """Completion rate rows, largest groups first"""
+    return [
+        CompletionRate(
+            key=key.value if isinstance(key, PriorityEnum) else key,
+            completed=value.completed,
+            total=value.total,
+            completion_rate=round(value.completed / value.total, 4) if value.total else 0.0,
+        )
+        for key, value in sorted(counts.items(), key=lambda item: -item[1].total)
+    ]
+
+
+@router.get("/analytics", response_model=AnalyticsResponse)
+async def get_analytics(
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get productivity analytics
+    
+    - Completion heatmap for the last year (days without completions omitted)
+    - Completion rates per category and per priority
+    - Aggregated in SQL once, then cached and updated as tasks are completed
+    """
+    analytics = await get_user_analytics(current_user.id, db)
+    
+    end = date.today()
+    start = heatmap_start(end)
+    
+    return AnalyticsResponse(
+        heatmap_start=start,
+        heatmap_end=end,
+        heatmap=[
+            HeatmapDay(date=day, count=count)
+            for day, count in sorted(analytics.heatmap.items())
+            if start <= day <= end
+        ],
+        by_category=_completion_rates(analytics.by_category),
+        by_priority=_completion_rates(analytics.by_priority),
+    )
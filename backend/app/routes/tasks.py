@@ -1,24 +1,66 @@
+import uuid
 from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, or_, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import and_, false, func, insert, select, true, tuple_, union_all, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.middleware.auth import get_verified_user
-from app.models.task import PriorityEnum, StatusEnum, Task
-from app.models.user import User
-from app.schemas.gamification import XPAwardResponse
-from app.schemas.task import TaskCreate, TaskResponse, TaskUpdate
-from app.services.gamification import award_xp
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from app.core.validation import format_validation_error
+from app.middleware.auth import Principal, get_verified_principal
+from app.models.task import PriorityEnum, StatusEnum, Task, TaskTombstone
+from app.schemas.gamification import BulkXPAwardResponse, XPAwardResponse
+from app.schemas.task import (
+    TaskBulkComplete,
+    TaskBulkCreate,
+    TaskBulkCreateResponse,
+    TaskBulkItemResult,
+    TaskChangesResponse,
+    TaskCreate,
+    TaskImportResponse,
+    TaskResponse,
+    TaskUpdate,
+)
+from app.services.analytics import invalidate_user_analytics, record_completions
+from app.services.calendar_autosync import calendar_auto_sync
+from app.services.gamification import award_xp, award_xp_batch
+from app.services.search import fulltext_condition, search_tasks
+from app.services.task_export import stream_task_export
+from app.services.task_import import import_tasks
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 
+async def _task_list_version(user_id: uuid.UUID, db: AsyncSession) -> tuple[int | None, int | None]:
+    """
+    Cheap validator for a user's task list
+    
+    Every insert, update and delete bumps a change_seq, so the highest
+    sequence among the user's tasks and tombstones changes with any write.
+    Both lookups are served by the (user_id, change_seq) indexes.
+    """
+    result = await db.execute(
+        select(
+            select(func.max(Task.change_seq))
+            .where(Task.user_id == user_id)
+            .scalar_subquery(),
+            select(func.max(TaskTombstone.change_seq))
+            .where(TaskTombstone.user_id == user_id)
+            .scalar_subquery(),
+        )
+    )
+    return tuple(result.one())
+
+
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
-    current_user: User = Depends(get_verified_user),
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -40,25 +82,161 @@ async def create_task(
     db.add(task)
     await db.commit()
     await db.refresh(task)
+    invalidate_user_analytics(current_user.id)
+    if task.due_date:
+        calendar_auto_sync.enqueue(current_user.id, [task.id])
     
     return task
 
 
+@router.post("/bulk", response_model=TaskBulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_tasks_bulk(
+    bulk_data: TaskBulkCreate,
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create many tasks in one request
+    
+    - Validates every item, then inserts all valid items with one multi-row INSERT
+    - atomic=true: any invalid item rejects the whole batch
+    - atomic=false: valid items are created, invalid ones are reported
+    """
+    results: list[TaskBulkItemResult] = []
+    rows: list[dict] = []
+    row_indexes: list[int] = []
+    
+    # Validate all items in one pass
+    for index, item in enumerate(bulk_data.tasks):
+        if not isinstance(item, dict):
+            results.append(TaskBulkItemResult(index=index, success=False, error="Expected a JSON object"))
+            continue
+        try:
+            task_data = TaskCreate.model_validate(item)
+        except ValidationError as e:
+            error = format_validation_error(e)
+            results.append(TaskBulkItemResult(index=index, success=False, error=error))
+            continue
+        
+        rows.append({
+            "user_id": current_user.id,
+            "title": task_data.title,
+            "description": task_data.description,
+            "priority": task_data.priority,
+            "category": task_data.category,
+            "tags": task_data.tags or [],
+            "due_date": task_data.due_date,
+        })
+        row_indexes.append(index)
+    
+    if results and bulk_data.atomic:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[result.model_dump() for result in results],
+        )
+    
+    if rows:
+        # insertmanyvalues renders this as multi-row INSERT ... RETURNING
+        created = await db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            rows,
+        )
+        created_ids = []
+        for index, task in zip(row_indexes, created.all(), strict=True):
+            results.append(
+                TaskBulkItemResult(index=index, success=True, task=TaskResponse.model_validate(task))
+            )
+            if task.due_date:
+                created_ids.append(task.id)
+        await db.commit()
+        invalidate_user_analytics(current_user.id)
+        calendar_auto_sync.enqueue(current_user.id, created_ids)
+    
+    results.sort(key=lambda result: result.index)
+    
+    return TaskBulkCreateResponse(
+        created=len(rows),
+        failed=len(results) - len(rows),
+        results=results,
+    )
+
+
+@router.post("/complete", response_model=BulkXPAwardResponse)
+async def complete_tasks_bulk(
+    bulk_data: TaskBulkComplete,
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Mark several tasks as completed at once
+    
+    - Completes all pending tasks in one UPDATE
+    - Awards XP, updates streak and checks achievements once for the batch
+    - Already completed or unknown task IDs are skipped
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(Task)
+        .where(
+            Task.user_id == current_user.id,
+            Task.id.in_(bulk_data.task_ids),
+            Task.status == StatusEnum.PENDING,
+        )
+        .values(status=StatusEnum.COMPLETED, completed_at=now, updated_at=now)
+        .returning(Task.id, Task.priority, Task.category, Task.due_date, Task.google_event_id)
+        .execution_options(synchronize_session=False)
+    )
+    completed = result.all()
+    
+    # Award XP and check achievements
+    reward_data = await award_xp_batch(
+        str(current_user.id),
+        [row.priority for row in completed],
+        db,
+    )
+    record_completions(current_user.id, [(row.category, row.priority, now) for row in completed])
+    calendar_auto_sync.enqueue(
+        current_user.id, [row.id for row in completed if row.due_date or row.google_event_id]
+    )
+    
+    return BulkXPAwardResponse(
+        **reward_data,
+        completed_task_ids=[row.id for row in completed],
+    )
+
+
 @router.get("", response_model=list[TaskResponse])
 async def get_tasks(
+    request: Request,
+    response: Response,
     status_filter: StatusEnum | None = Query(None, alias="status"),
     priority_filter: PriorityEnum | None = Query(None, alias="priority"),
     category_filter: str | None = Query(None, alias="category"),
     search: str | None = Query(None),
-    current_user: User = Depends(get_verified_user),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get all tasks for current user with optional filters
+    Get a page of tasks for current user with optional filters
     
     - Filter by status, priority, category
-    - Search in title and description
+    - Full-text search in title, description, tags and category
+    - Newest first; pass the X-Next-Cursor header back as `cursor` for the next page
+    - Honors If-None-Match with 304 Not Modified
     """
+    # Answer conditional requests before loading any rows
+    etag = make_etag(
+        "tasks",
+        current_user.id,
+        *await _task_list_version(current_user.id, db),
+        request.url.query,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
     query = select(Task).where(Task.user_id == current_user.id)
     
     # Apply filters
@@ -72,27 +250,147 @@ async def get_tasks(
         query = query.where(Task.category == category_filter)
     
     if search:
-        search_pattern = f"%{search}%"
-        query = query.where(
-            or_(
-                Task.title.ilike(search_pattern),
-                Task.description.ilike(search_pattern)
+        search_match = fulltext_condition(search)
+        if search_match is not None:
+            query = query.where(search_match)
+    
+    # Resume after the last row of the previous page
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
             )
+        query = query.where(
+            tuple_(Task.created_at, Task.id) < tuple_(cursor_created_at, cursor_id)
         )
     
-    # Order by created_at descending
-    query = query.order_by(Task.created_at.desc())
+    # Order by (created_at, id) descending so the sort key is unique
+    query = query.order_by(Task.created_at.desc(), Task.id.desc()).limit(limit + 1)
     
     result = await db.execute(query)
     tasks = result.scalars().all()
     
+    # Fetched one extra row to learn whether another page exists
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        last = tasks[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    
     return tasks
 
 
+@router.get("/changes", response_model=TaskChangesResponse)
+async def get_task_changes(
+    since: int = Query(0, ge=0, description="next_token from the previous call; 0 for a full sync"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get tasks created, updated or deleted since a change token
+    
+    - Returns changed tasks and IDs of deleted tasks in change order
+    - Call again with next_token while has_more is true
+    """
+    # Page through tasks and tombstones in one statement, so both are read
+    # from the same snapshot; one extra row detects further pages
+    changes = union_all(
+        select(Task.change_seq, Task.id.label("task_id"), false().label("deleted"))
+        .where(Task.user_id == current_user.id, Task.change_seq > since),
+        select(TaskTombstone.change_seq, TaskTombstone.task_id, true())
+        .where(TaskTombstone.user_id == current_user.id, TaskTombstone.change_seq > since),
+    ).subquery()
+    result = await db.execute(select(changes).order_by(changes.c.change_seq).limit(limit + 1))
+    entries = result.all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    
+    # A task changed again since the page was read is returned in its newer
+    # state (and again later); one deleted since will arrive as a tombstone
+    changed_ids = [entry.task_id for entry in entries if not entry.deleted]
+    tasks = {}
+    if changed_ids:
+        result = await db.execute(select(Task).where(Task.id.in_(changed_ids)))
+        tasks = {task.id: task for task in result.scalars().all()}
+    
+    return TaskChangesResponse(
+        changed=[tasks[task_id] for task_id in changed_ids if task_id in tasks],
+        deleted=[entry.task_id for entry in entries if entry.deleted],
+        next_token=entries[-1].change_seq if entries else since,
+        has_more=has_more,
+    )
+
+
+@router.get("/export")
+async def export_tasks(
+    request: Request,
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    current_user: Principal = Depends(get_verified_principal),
+):
+    """
+    Export all of the current user's tasks
+    
+    - NDJSON (one task per line) or CSV
+    - Streamed from a server-side cursor in constant memory
+    - Gzip-encoded when the client sends Accept-Encoding: gzip
+    """
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+    media_type = "application/x-ndjson" if export_format == "ndjson" else "text/csv"
+    headers = {"Content-Disposition": f'attachment; filename="tasks.{export_format}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    
+    return StreamingResponse(
+        stream_task_export(str(current_user.id), export_format, compress),
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+@router.post("/import", response_model=TaskImportResponse)
+async def import_tasks_stream(
+    request: Request,
+    import_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Import tasks from a CSV or NDJSON request body
+    
+    - Body is parsed as it streams in; rows are validated like task creation
+    - Valid rows are loaded in batches with COPY, invalid rows are reported
+    - CSV needs a header row; tags are separated by semicolons
+    """
+    result = await import_tasks(current_user.id, request.stream(), import_format, db)
+    invalidate_user_analytics(current_user.id)
+    
+    return TaskImportResponse(**result)
+
+
+@router.get("/search", response_model=list[TaskResponse])
+async def search_user_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_verified_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Ranked search over the current user's tasks
+    
+    - Prefix matching for search-as-you-type
+    - Best matches first, typo-tolerant fallback on titles
+    """
+    return await search_tasks(str(current_user.id), q, limit, db)
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: str,
-    current_user: User = Depends(get_verified_user),
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -123,7 +421,7 @@ async def get_task(
 async def update_task(
     task_id: str,
     task_data: TaskUpdate,
-    current_user: User = Depends(get_verified_user),
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -157,6 +455,9 @@ async def update_task(
     
     await db.commit()
     await db.refresh(task)
+    invalidate_user_analytics(current_user.id)
+    if task.due_date or task.google_event_id:
+        calendar_auto_sync.enqueue(current_user.id, [task.id])
     
     return task
 
@@ -164,13 +465,14 @@ async def update_task(
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: str,
-    current_user: User = Depends(get_verified_user),
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a task
     
     - Permanently deletes task
+    - Leaves a tombstone for delta sync and calendar event cleanup
     """
     result = await db.execute(
         select(Task).where(
@@ -188,8 +490,13 @@ async def delete_task(
             detail="Task not found"
         )
     
+    deleted_id = task.id if task.google_event_id else None
+    db.add(TaskTombstone(task_id=task.id, user_id=current_user.id, google_event_id=task.google_event_id))
     await db.delete(task)
     await db.commit()
+    invalidate_user_analytics(current_user.id)
+    if deleted_id:
+        calendar_auto_sync.enqueue(current_user.id, [deleted_id])
     
     return None
 
@@ -197,7 +504,7 @@ async def delete_task(
 @router.post("/{task_id}/complete", response_model=XPAwardResponse)
 async def complete_task(
     task_id: str,
-    current_user: User = Depends(get_verified_user),
+    current_user: Principal = Depends(get_verified_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -240,5 +547,8 @@ async def complete_task(
     reward_data = await award_xp(str(current_user.id), task.priority, db)
     
     await db.commit()
+    record_completions(current_user.id, [(task.category, task.priority, task.completed_at)])
+    if task.due_date or task.google_event_id:
+        calendar_auto_sync.enqueue(current_user.id, [task.id])
     
     return XPAwardResponse(**reward_data)
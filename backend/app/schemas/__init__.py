@@ -1,6 +1,30 @@
 from app.schemas.auth import PasswordResetConfirm, PasswordResetRequest, TokenResponse
-from app.schemas.gamification import AchievementResponse, UserStatsResponse, XPAwardResponse
-from app.schemas.task import TaskCreate, TaskResponse, TaskUpdate
+from app.schemas.dashboard import DashboardResponse, TaskCounts
+from app.schemas.gamification import (
+    AchievementResponse,
+    AnalyticsResponse,
+    BulkXPAwardResponse,
+    CompletionRate,
+    HeatmapDay,
+    LeaderboardEntry,
+    LeaderboardResponse,
+    UserStatsResponse,
+    XPAwardResponse,
+    XPHistoryPoint,
+    XPHistoryResponse,
+)
+from app.schemas.task import (
+    TaskBulkComplete,
+    TaskBulkCreate,
+    TaskBulkCreateResponse,
+    TaskBulkItemResult,
+    TaskChangesResponse,
+    TaskCreate,
+    TaskImportError,
+    TaskImportResponse,
+    TaskResponse,
+    TaskUpdate,
+)
 from app.schemas.user import UserCreate, UserLogin, UserResponse, UserUpdate
 
 __all__ = [
@@ -14,7 +38,24 @@ __all__ = [
     "TaskCreate",
     "TaskUpdate",
     "TaskResponse",
+    "TaskBulkCreate",
+    "TaskBulkItemResult",
+    "TaskBulkCreateResponse",
+    "TaskBulkComplete",
+    "TaskChangesResponse",
+    "TaskImportError",
+    "TaskImportResponse",
     "UserStatsResponse",
     "AchievementResponse",
     "XPAwardResponse",
+    "BulkXPAwardResponse",
+    "LeaderboardEntry",
+    "LeaderboardResponse",
+    "XPHistoryPoint",
+    "XPHistoryResponse",
+    "HeatmapDay",
+    "CompletionRate",
+    "AnalyticsResponse",
+    "TaskCounts",
+    "DashboardResponse",
 ]
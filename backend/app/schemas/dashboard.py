@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+
+from app.schemas.gamification import AchievementResponse, UserStatsResponse
+from app.schemas.task import TaskResponse
+from app.schemas.user import UserResponse
+
+
+# Task Counts
+class TaskCounts(BaseModel):
+    total: int
+    overdue: int
+    by_status: dict[str, int]
+    by_priority: dict[str, int]
+
+
+# Dashboard Response
+class DashboardResponse(BaseModel):
+    user: UserResponse
+    stats: UserStatsResponse
+    achievements: list[AchievementResponse]
+    achievements_unlocked: int
+    task_counts: TaskCounts
+    upcoming_tasks: list[TaskResponse]
+    recently_completed: list[TaskResponse]
@@ -42,3 +42,60 @@ class XPAwardResponse(BaseModel):
     level: int
     level_up: bool
     new_achievements: list[str] = []
+
+
+# Bulk Completion XP Award Response
+class BulkXPAwardResponse(XPAwardResponse):
+    completed_task_ids: list[uuid.UUID] = []
+
+
+# Leaderboard Schemas
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: uuid.UUID
+    username: str
+    xp: int
+
+
+class LeaderboardResponse(BaseModel):
+    period: str
+    period_start: date | None = None
+    total_users: int
+    top: list[LeaderboardEntry]
+    me: LeaderboardEntry | None = None
+    neighbors: list[LeaderboardEntry] = []
+
+
+# XP History Schemas
+class XPHistoryPoint(BaseModel):
+    period_start: date
+    xp: int
+
+
+class XPHistoryResponse(BaseModel):
+    period: str
+    start: date
+    end: date
+    total_xp: int
+    points: list[XPHistoryPoint]
+
+
+# Productivity Analytics Schemas
+class HeatmapDay(BaseModel):
+    date: date
+    count: int
+
+
+class CompletionRate(BaseModel):
+    key: str | None
+    completed: int
+    total: int
+    completion_rate: float
+
+
+class AnalyticsResponse(BaseModel):
+    heatmap_start: date
+    heatmap_end: date
+    heatmap: list[HeatmapDay]
+    by_category: list[CompletionRate]
+    by_priority: list[CompletionRate]
@@ -1,10 +1,14 @@
 import uuid
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel, Field
 
 from app.models.task import PriorityEnum, StatusEnum
 
+# Maximum number of tasks accepted by one bulk request
+MAX_BULK_TASKS = 500
+
 
 # Task Creation
 class TaskCreate(BaseModel):
@@ -44,3 +48,53 @@ class TaskResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+# Bulk Task Creation
+class TaskBulkCreate(BaseModel):
+    # Items are validated individually against TaskCreate so that
+    # best-effort requests can report per-item errors (including items
+    # that are not objects at all)
+    tasks: list[Any] = Field(..., min_length=1, max_length=MAX_BULK_TASKS)
+    atomic: bool = True  # All-or-nothing when True, best-effort when False
+
+
+# Bulk Task Creation Item Result
+class TaskBulkItemResult(BaseModel):
+    index: int
+    success: bool
+    task: TaskResponse | None = None
+    error: str | None = None
+
+
+# Bulk Task Creation Response
+class TaskBulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[TaskBulkItemResult]
+
+
+# Bulk Task Completion
+class TaskBulkComplete(BaseModel):
+    task_ids: list[uuid.UUID] = Field(..., min_length=1, max_length=MAX_BULK_TASKS)
+
+
+# Task Changes (delta sync) Response
+class TaskChangesResponse(BaseModel):
+    changed: list[TaskResponse]
+    deleted: list[uuid.UUID]
+    next_token: int  # Pass back as `since` on the next call
+    has_more: bool
+
+
+# Task Import Row Error
+class TaskImportError(BaseModel):
+    row: int
+    error: str
+
+
+# Task Import Response
+class TaskImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: list[TaskImportError]  # First errors only; see `failed` for the total
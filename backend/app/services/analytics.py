@@ -0,0 +1,120 @@
+"""Per-user productivity analytics with cached, incrementally updated aggregates"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.task import PriorityEnum, StatusEnum, Task
+
+# Days covered by the completion heatmap
+HEATMAP_DAYS = 365
+
+
+@dataclass
+class CompletionCounts:
+    """Completed and total task counts for one category or priority"""
+    completed: int = 0
+    total: int = 0
+
+
+@dataclass
+class UserAnalytics:
+    """Cached aggregates for one user"""
+    heatmap: dict[date, int] = field(default_factory=dict)
+    by_category: dict[str | None, CompletionCounts] = field(default_factory=dict)
+    by_priority: dict[PriorityEnum, CompletionCounts] = field(default_factory=dict)
+
+
+# Keyed by user ID; other workers' completions show up once entries expire
+analytics_cache = TTLCache(
+    maxsize=settings.ANALYTICS_CACHE_SIZE,
+    ttl=settings.ANALYTICS_CACHE_TTL_SECONDS,
+)
+
+
+def heatmap_start(today: date) -> date:
+    """First day shown in the heatmap ending on `today`"""
+    return today - timedelta(days=HEATMAP_DAYS - 1)
+
+
+async def get_user_analytics(user_id: uuid.UUID, db: AsyncSession) -> UserAnalytics:
+    """
+    Get a user's analytics, aggregating in SQL on a cache miss
+
+    Args:
+        user_id: User's ID
+        db: Database session
+
+    Returns:
+        Heatmap and completion counts by category and priority
+    """
+    analytics = analytics_cache.get(user_id)
+    if analytics is not None:
+        return analytics
+
+    analytics = UserAnalytics()
+
+    # Completions per day, served by the (user_id, completed_at) index
+    day = cast(func.date_trunc("day", Task.completed_at), Date)
+    result = await db.execute(
+        select(day, func.count())
+        .where(
+            Task.user_id == user_id,
+            Task.completed_at >= heatmap_start(date.today()),
+        )
+        .group_by(day)
+    )
+    analytics.heatmap = dict(result.all())
+
+    # Totals per (category, priority) pair, folded into both breakdowns
+    result = await db.execute(
+        select(
+            Task.category,
+            Task.priority,
+            func.count().filter(Task.status == StatusEnum.COMPLETED),
+            func.count(),
+        )
+        .where(Task.user_id == user_id)
+        .group_by(Task.category, Task.priority)
+    )
+    for category, priority, completed, total in result:
+        for counts in (
+            analytics.by_category.setdefault(category, CompletionCounts()),
+            analytics.by_priority.setdefault(priority, CompletionCounts()),
+        ):
+            counts.completed += completed
+            counts.total += total
+
+    analytics_cache.set(user_id, analytics)
+    return analytics
+
+
+def record_completions(user_id: uuid.UUID, completions: list[tuple[str | None, PriorityEnum, datetime]]) -> None:
+    """
+    Fold newly completed tasks into the cached aggregates
+
+    The tasks were already counted as pending, so only completed counts
+    and the heatmap move. Nothing happens if the user isn't cached.
+
+    Args:
+        user_id: User's ID
+        completions: (category, priority, completed_at) of each completed task
+    """
+    analytics = analytics_cache.get(user_id)
+    if analytics is None:
+        return
+
+    for category, priority, completed_at in completions:
+        day = completed_at.date()
+        analytics.heatmap[day] = analytics.heatmap.get(day, 0) + 1
+        analytics.by_category.setdefault(category, CompletionCounts()).completed += 1
+        analytics.by_priority.setdefault(priority, CompletionCounts()).completed += 1
+
+
+def invalidate_user_analytics(user_id: uuid.UUID) -> None:
+    """Drop a user's cached aggregates after creates, edits, deletes or imports"""
+    analytics_cache.pop(user_id)
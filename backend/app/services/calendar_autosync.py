@@ -0,0 +1,140 @@
+"""Debounced push of task edits to Google Calendar"""
+import asyncio
+import contextlib
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.calendar_client import CalendarNotConnected, calendar_clients
+from app.services.calendar_sync import SyncAlreadyRunning, calendar_sync_runner
+
+
+@dataclass
+class PendingChanges:
+    """Tasks a user touched since their last flush"""
+    task_ids: set[uuid.UUID] = field(default_factory=set)
+    first_change: float = 0.0
+    last_change: float = 0.0
+
+
+class CalendarAutoSync:
+    """
+    Pushes task mutations to Google Calendar in the background
+
+    Task routes call enqueue() after commit, which only records the task ID
+    in memory. A consumer flushes a user once their edits have been quiet
+    for `debounce` seconds (or `max_delay` after the first edit, for users
+    who never stop), submitting one sync job for all their touched tasks.
+    The job reads each task's current row, so a burst of edits becomes a
+    single net change, and unchanged events are skipped by fingerprint.
+
+    Users without a Google token are dropped at flush time. If a sync is
+    already running for the user the tasks are queued again. Pending edits
+    are per process and lost on restart; the next manual sync catches up.
+    """
+
+    def __init__(self, debounce: float, max_delay: float):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._pending: dict[uuid.UUID, PendingChanges] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._enqueued = 0
+        self._flushed_tasks = 0
+        self._jobs = 0
+
+    def start(self) -> None:
+        """Start the background consumer"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the consumer; unflushed edits are dropped"""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def enqueue(self, user_id: uuid.UUID, task_ids: Iterable[uuid.UUID]) -> None:
+        """
+        Record changed tasks for a later push
+
+        Never waits on the database or Google, so it is safe to call from
+        the request path.
+
+        Args:
+            user_id: Owner of the tasks
+            task_ids: Created, updated, completed or deleted task IDs
+        """
+        if self._task is None:
+            return
+        task_ids = set(task_ids)
+        if task_ids:
+            self._enqueued += len(task_ids)
+            self._add(user_id, task_ids)
+
+    def _add(self, user_id: uuid.UUID, task_ids: set[uuid.UUID]) -> None:
+        now = time.monotonic()
+        pending = self._pending.get(user_id)
+        if pending is None:
+            pending = self._pending[user_id] = PendingChanges(first_change=now)
+        pending.task_ids |= task_ids
+        pending.last_change = now
+        self._wakeup.set()
+
+    def metrics(self) -> dict:
+        """Coalescing counters since startup"""
+        return {
+            "enqueued": self._enqueued,
+            "flushed_tasks": self._flushed_tasks,
+            "jobs": self._jobs,
+            "pending_users": len(self._pending),
+        }
+
+    def _due_at(self, pending: PendingChanges) -> float:
+        return min(pending.last_change + self.debounce, pending.first_change + self.max_delay)
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            due = [user_id for user_id, pending in self._pending.items() if self._due_at(pending) <= now]
+            for user_id in due:
+                pending = self._pending.pop(user_id)
+                try:
+                    await self._flush(user_id, pending)
+                except Exception as e:
+                    print(f"Error in calendar auto-sync for {user_id}: {e}")
+
+            timeout = None
+            if self._pending:
+                timeout = max(0.0, min(self._due_at(p) for p in self._pending.values()) - time.monotonic())
+            self._wakeup.clear()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+
+    async def _flush(self, user_id: uuid.UUID, pending: PendingChanges) -> None:
+        async with AsyncSessionLocal() as db:
+            try:
+                await calendar_clients.get_credentials(user_id, db)
+            except CalendarNotConnected:
+                return
+
+            try:
+                await calendar_sync_runner.submit(user_id, sorted(pending.task_ids), db, automatic=True)
+            except SyncAlreadyRunning:
+                # Retry after another debounce window
+                self._add(user_id, pending.task_ids)
+                return
+
+        self._flushed_tasks += len(pending.task_ids)
+        self._jobs += 1
+
+
+calendar_auto_sync = CalendarAutoSync(
+    debounce=settings.CALENDAR_AUTOSYNC_DEBOUNCE_SECONDS,
+    max_delay=settings.CALENDAR_AUTOSYNC_MAX_DELAY_SECONDS,
+)
@@ -0,0 +1,180 @@
+"""Per-user Google credential cache with proactive, single-flight token refresh"""
+import asyncio
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.query_stats import create_background_task
+from app.models.google_token import GoogleToken
+from app.services.google_api import google_api
+
+
+class CalendarNotConnected(Exception):
+    """Raised when the user has no stored Google token"""
+
+
+@dataclass
+class GoogleCredentials:
+    """A user's Google tokens"""
+    token: str
+    refresh_token: str | None
+    expiry: datetime | None
+
+
+class CalendarClientManager:
+    """
+    Hands out ready-to-use Google credentials per user
+
+    Credentials are cached per process and refreshed before they expire
+    (GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS), so syncs rarely hit a refresh
+    mid-run. Concurrent callers for one user share a single
+    refresh, and refreshed tokens are written back to GoogleToken in the
+    background.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, refresh_margin: timedelta):
+        self.refresh_margin = refresh_margin
+        self._credentials = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._refreshes: dict[uuid.UUID, asyncio.Task] = {}
+        self._writes: set[asyncio.Task] = set()
+        self._refreshed = 0
+
+    async def get_credentials(
+        self, user_id: uuid.UUID, db: AsyncSession | None = None, force_refresh: bool = False
+    ) -> GoogleCredentials:
+        """
+        Get valid credentials for a user
+
+        Args:
+            user_id: User's ID
+            db: Database session for a cache miss; without one a short session is opened
+            force_refresh: Refresh even if the token looks valid (e.g. after a 401)
+
+        Returns:
+            Credentials whose token is good for at least the refresh margin
+
+        Raises:
+            CalendarNotConnected: The user has not connected Google Calendar
+        """
+        credentials = self._credentials.get(user_id)
+        if credentials is None:
+            if db is None:
+                async with AsyncSessionLocal() as db:
+                    google_token = await self._load_token(user_id, db)
+            else:
+                google_token = await self._load_token(user_id, db)
+            if not google_token:
+                raise CalendarNotConnected("Google Calendar not connected")
+            credentials = GoogleCredentials(
+                token=google_token.access_token or "",
+                refresh_token=google_token.refresh_token,
+                expiry=google_token.token_expiry,
+            )
+            self._credentials.set(user_id, credentials)
+
+        if force_refresh or self._needs_refresh(credentials):
+            credentials = await self._refresh(user_id, credentials)
+        return credentials
+
+    @staticmethod
+    async def _load_token(user_id: uuid.UUID, db: AsyncSession) -> GoogleToken | None:
+        result = await db.execute(select(GoogleToken).where(GoogleToken.user_id == user_id))
+        return result.scalar_one_or_none()
+
+    def token_getter(self, user_id: uuid.UUID) -> Callable[[bool], Awaitable[str]]:
+        """
+        get_token(force_refresh) callback for sync_tasks_to_calendar
+
+        Holds no session, so no connection stays checked out while the
+        caller talks to Google.
+        """
+        async def get_token(force_refresh: bool) -> str:
+            credentials = await self.get_credentials(user_id, force_refresh=force_refresh)
+            return credentials.token
+        return get_token
+
+    def _needs_refresh(self, credentials: GoogleCredentials) -> bool:
+        if not credentials.token:
+            return True
+        if credentials.expiry is None:
+            return False
+        return credentials.expiry - self.refresh_margin <= datetime.utcnow()
+
+    async def _refresh(self, user_id: uuid.UUID, credentials: GoogleCredentials) -> GoogleCredentials:
+        """Refresh once per user no matter how many callers are waiting"""
+        refresh = self._refreshes.get(user_id)
+        if refresh is None:
+            # Its own task, so a cancelled caller can't leave the others waiting forever
+            refresh = create_background_task(self._refresh_token(user_id, credentials))
+            self._refreshes[user_id] = refresh
+            refresh.add_done_callback(lambda _: self._refreshes.pop(user_id, None))
+            # Waiters re-raise a failed refresh; don't warn when there were none
+            refresh.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return await asyncio.shield(refresh)
+
+    async def _refresh_token(self, user_id: uuid.UUID, credentials: GoogleCredentials) -> GoogleCredentials:
+        try:
+            if not credentials.refresh_token:
+                raise CalendarNotConnected("Google token expired and cannot be refreshed; reconnect Google Calendar")
+            token, expiry = await google_api.refresh_access_token(credentials.refresh_token)
+        except BaseException:
+            # Drop the cached copy so the next call reloads from the database
+            self._credentials.pop(user_id)
+            raise
+        credentials = GoogleCredentials(token=token, refresh_token=credentials.refresh_token, expiry=expiry)
+        self._refreshed += 1
+        self._credentials.set(user_id, credentials)
+        self.persist(user_id, credentials)
+        return credentials
+
+    def persist(self, user_id: uuid.UUID, credentials: GoogleCredentials) -> None:
+        """Write the current access token back to GoogleToken without blocking the caller"""
+        task = create_background_task(self._write_token(user_id, credentials.token, credentials.expiry))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _write_token(self, user_id: uuid.UUID, access_token: str, expiry: datetime | None) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(GoogleToken)
+                    .where(GoogleToken.user_id == user_id)
+                    .values(access_token=access_token, token_expiry=expiry, updated_at=datetime.utcnow())
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"Error saving refreshed Google token: {e}")
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        """Forget a user's credentials after connect or disconnect"""
+        self._credentials.pop(user_id)
+
+    def metrics(self) -> dict:
+        """Cache size and refresh counters"""
+        return {
+            "cached_users": len(self._credentials),
+            "refreshes": self._refreshed,
+            "refreshes_in_flight": len(self._refreshes),
+        }
+
+    async def shutdown(self) -> None:
+        """Cancel in-flight refreshes and finish pending token writes"""
+        for refresh in list(self._refreshes.values()):
+            refresh.cancel()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+
+calendar_clients = CalendarClientManager(
+    maxsize=settings.GOOGLE_CREDENTIALS_CACHE_SIZE,
+    ttl=settings.GOOGLE_CREDENTIALS_CACHE_TTL_SECONDS,
+    refresh_margin=timedelta(seconds=settings.GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS),
+)
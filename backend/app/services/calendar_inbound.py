@@ -0,0 +1,230 @@
+"""Inbound Google Calendar sync: fold event edits back into tasks"""
+import asyncio
+import contextlib
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.core.query_stats import create_background_task
+from app.models.google_token import GoogleToken
+from app.models.task import Task
+from app.services.calendar_autosync import calendar_auto_sync
+from app.services.calendar_client import CalendarNotConnected, calendar_clients
+from app.services.google_api import GoogleAPIError, google_api
+from app.services.google_calendar import CalendarTask, apply_event_changes
+
+# Largest page the events list allows
+LIST_PAGE_SIZE = 2500
+
+# Times a pull re-fetches after losing a race with a concurrent pull
+PULL_ATTEMPTS = 3
+
+
+async def _list_changed_events(
+    get_token: Callable[[bool], Awaitable[str]], sync_token: str | None
+) -> tuple[list[dict], str | None]:
+    """
+    Events changed since sync_token, or every event when there is none
+
+    A 401 is retried once with a refreshed token; an expired sync token
+    (410) falls back to a full listing.
+    """
+    refreshed = False
+    token = await get_token(False)
+    while True:
+        params = {"maxResults": LIST_PAGE_SIZE}
+        if sync_token:
+            params["syncToken"] = sync_token
+        try:
+            return await google_api.list_events(token, **params)
+        except GoogleAPIError as e:
+            if e.status == 401 and not refreshed:
+                refreshed = True
+                token = await get_token(True)
+            elif e.status == 410 and sync_token:
+                sync_token = None
+            else:
+                raise
+
+
+async def pull_calendar_changes(user_id: uuid.UUID, db: AsyncSession) -> dict:
+    """
+    Apply edits made in Google Calendar to the user's tasks
+
+    Only events changed since the stored nextSyncToken are fetched. An
+    event edited after its task takes over the task's title and due date;
+    a task edited after its event keeps its values and is queued to be
+    pushed again.
+
+    No transaction is open while Google is called. The GoogleToken row is
+    then locked just long enough to apply the result; if another pull stored a
+    new sync token in the meantime, the fetched page is stale and the pull
+    starts over from that token.
+
+    Args:
+        user_id: User's ID
+        db: Database session (committed here)
+
+    Returns:
+        Counts of fetched events and applied/kept-local/unchanged/ignored changes
+
+    Raises:
+        CalendarNotConnected: The user has not connected Google Calendar
+        GoogleAPIError: Listing events failed
+    """
+    get_token = calendar_clients.token_getter(user_id)
+    result = await db.execute(select(GoogleToken.sync_token).where(GoogleToken.user_id == user_id))
+    row = result.one_or_none()
+    await db.commit()
+    if row is None:
+        raise CalendarNotConnected("Google Calendar not connected")
+    sync_token = row.sync_token
+
+    for _ in range(PULL_ATTEMPTS):
+        events, next_sync_token = await _list_changed_events(get_token, sync_token)
+
+        result = await db.execute(
+            select(GoogleToken).where(GoogleToken.user_id == user_id).with_for_update()
+        )
+        google_token = result.scalar_one_or_none()
+        if not google_token:
+            await db.rollback()
+            raise CalendarNotConnected("Google Calendar not connected")
+        if google_token.sync_token != sync_token:
+            # Another pull got here first; fetch again from where it left off
+            sync_token = google_token.sync_token
+            await db.rollback()
+            continue
+
+        outcomes = await _apply_pulled_events(user_id, events, db)
+        google_token.sync_token = next_sync_token
+        await db.commit()
+
+        if outcomes["local"]:
+            calendar_auto_sync.enqueue(user_id, [task.id for task in outcomes["local"]])
+
+        return {
+            "fetched": len(events),
+            "applied": len(outcomes["remote"]),
+            "kept_local": len(outcomes["local"]),
+            "unchanged": len(outcomes["unchanged"]),
+            "ignored": len(outcomes["ignored"]),
+        }
+
+    # Concurrent pulls kept moving the token; they carry the changes forward
+    return {"fetched": 0, "applied": 0, "kept_local": 0, "unchanged": 0, "ignored": 0}
+
+
+async def _apply_pulled_events(user_id: uuid.UUID, events: list[dict], db: AsyncSession) -> dict:
+    """Resolve fetched events against the user's tasks and write the outcome (not committed)"""
+    event_ids = list({event["id"] for event in events if event.get("id")})
+    tasks = {}
+    if event_ids:
+        # Locked until commit, so a user edit can't land between comparing
+        # updated_at and writing the remote values over it
+        result = await db.execute(
+            select(Task)
+            .where(Task.user_id == user_id, Task.google_event_id.in_(event_ids))
+            .order_by(Task.id)
+            .with_for_update()
+        )
+        tasks = {task.google_event_id: CalendarTask.from_task(task) for task in result.scalars().all()}
+
+    outcomes = apply_event_changes(tasks, events)
+
+    tasks_table = Task.__table__
+    connection = await db.connection()
+    if outcomes["remote"]:
+        # A real edit: updated_at moves and change_seq advances for delta sync
+        await connection.execute(
+            update(tasks_table)
+            .where(tasks_table.c.id == bindparam("task_id"))
+            .values(
+                title=bindparam("title"),
+                due_date=bindparam("due_date"),
+                google_event_fingerprint=bindparam("fingerprint"),
+                updated_at=datetime.utcnow(),
+            ),
+            [
+                {
+                    "task_id": task.id,
+                    "title": task.title,
+                    "due_date": task.due_date,
+                    "fingerprint": task.google_event_fingerprint,
+                }
+                for task in outcomes["remote"]
+            ],
+        )
+    if outcomes["local"]:
+        # Forget the fingerprint so the next push rewrites the event
+        await connection.execute(
+            update(tasks_table)
+            .where(tasks_table.c.id.in_([task.id for task in outcomes["local"]]))
+            .values(
+                google_event_fingerprint=None,
+                updated_at=tasks_table.c.updated_at,
+                change_seq=tasks_table.c.change_seq,
+            )
+        )
+    return outcomes
+
+
+class CalendarPullScheduler:
+    """
+    Runs inbound pulls triggered by push notifications
+
+    At most one pull per user runs at a time in this process. A
+    notification arriving mid-pull schedules exactly one more pull after
+    it, so bursts of notifications cost at most two list calls.
+    """
+
+    def __init__(self):
+        self._running: dict[uuid.UUID, asyncio.Task] = {}
+        self._rerun: set[uuid.UUID] = set()
+        self._pulls = 0
+        self._failed = 0
+
+    def request(self, user_id: uuid.UUID) -> None:
+        """Pull a user's changes in the background"""
+        if user_id in self._running:
+            self._rerun.add(user_id)
+            return
+        self._running[user_id] = create_background_task(self._pull(user_id))
+
+    async def _pull(self, user_id: uuid.UUID) -> None:
+        try:
+            while True:
+                self._rerun.discard(user_id)
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await pull_calendar_changes(user_id, db)
+                    self._pulls += 1
+                except CalendarNotConnected:
+                    return
+                except Exception as e:
+                    self._failed += 1
+                    print(f"Error pulling calendar changes for {user_id}: {e}")
+                    return
+                if user_id not in self._rerun:
+                    return
+        finally:
+            del self._running[user_id]
+
+    def metrics(self) -> dict:
+        """Pull counters since startup"""
+        return {"pulls": self._pulls, "failed": self._failed, "in_flight": len(self._running)}
+
+    async def shutdown(self) -> None:
+        """Cancel in-flight pulls"""
+        for task in list(self._running.values()):
+            task.cancel()
+        for task in list(self._running.values()):
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+calendar_pulls = CalendarPullScheduler()
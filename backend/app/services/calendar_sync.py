@@ -0,0 +1,280 @@
+"""Background Google Calendar sync jobs with persisted progress"""
+import asyncio
+import contextlib
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, bindparam, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.query_stats import create_background_task
+from app.models.calendar_sync_job import ACTIVE_SYNC_STATUSES, CalendarSyncJob, SyncJobStatusEnum
+from app.models.task import Task, TaskTombstone
+from app.services.calendar_client import calendar_clients
+from app.services.google_calendar import CalendarTask, sync_tasks_to_calendar
+
+# How often a running job writes its progress (and heartbeat)
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+
+async def save_sync_state(tasks: list[CalendarTask], db: AsyncSession) -> None:
+    """
+    Write back event ids and fingerprints of synced tasks
+
+    updated_at and change_seq are pinned so that calendar bookkeeping
+    doesn't look like a user edit to clients or delta sync.
+
+    Args:
+        tasks: Tasks passed to sync_tasks_to_calendar
+        db: Database session (caller commits)
+    """
+    now = datetime.utcnow()
+    synced = [task for task in tasks if task.dirty and not task.deleted]
+    removed = [task.id for task in tasks if task.dirty and task.deleted]
+
+    if synced:
+        # Core executemany; the ORM would treat a parameter list as bulk-by-primary-key
+        tasks_table = Task.__table__
+        connection = await db.connection()
+        await connection.execute(
+            update(tasks_table)
+            .where(tasks_table.c.id == bindparam("task_id"))
+            .values(
+                google_event_id=bindparam("event_id"),
+                google_event_fingerprint=bindparam("fingerprint"),
+                last_synced_at=now,
+                updated_at=tasks_table.c.updated_at,
+                change_seq=tasks_table.c.change_seq,
+            ),
+            [
+                {"task_id": task.id, "event_id": task.google_event_id, "fingerprint": task.google_event_fingerprint}
+                for task in synced
+            ],
+        )
+    if removed:
+        await db.execute(
+            update(TaskTombstone)
+            .where(TaskTombstone.task_id.in_(removed))
+            .values(google_event_id=None)
+            .execution_options(synchronize_session=False)
+        )
+
+
+class SyncAlreadyRunning(Exception):
+    """Raised when the user already has a queued or running sync"""
+
+    def __init__(self, job_id: uuid.UUID | None):
+        super().__init__("A calendar sync is already in progress")
+        self.job_id = job_id
+
+
+class CalendarSyncRunner:
+    """
+    Runs calendar syncs in the background
+
+    Each sync is a task on the event loop talking to Google over the shared
+    connection pool, while a coroutine mirrors its progress into
+    calendar_sync_jobs. Jobs beyond max_jobs wait as 'queued'. Database
+    sessions are only opened briefly (load, progress, save), never across
+    Google calls, and max_jobs is kept well below the connection pool size
+    so syncs can't starve request handlers. A partial unique index allows
+    one active job per user across all workers; jobs whose heartbeat went
+    stale (e.g. the worker died) are failed so the user can start again.
+
+    Finished jobs are pruned per user on the next submit: auto-sync jobs
+    right away (nobody polls them), manual ones after `retention`.
+    """
+
+    def __init__(self, max_jobs: int, stale_after: timedelta, retention: timedelta):
+        self.stale_after = stale_after
+        self.retention = retention
+        self._slots = asyncio.Semaphore(max_jobs)
+        self._jobs: set[asyncio.Task] = set()
+
+    async def submit(
+        self, user_id: uuid.UUID, task_ids: list[uuid.UUID] | None, db: AsyncSession, automatic: bool = False
+    ) -> CalendarSyncJob:
+        """
+        Create a sync job and start it in the background
+
+        Args:
+            user_id: User's ID
+            task_ids: Tasks to sync, or None for all tasks with due dates
+            db: Database session
+            automatic: Queued by auto-sync rather than requested by the user
+
+        Returns:
+            The queued job
+
+        Raises:
+            SyncAlreadyRunning: The user already has an active sync
+        """
+        await self._fail_stale_jobs(user_id, db)
+        await self._prune_finished_jobs(user_id, db)
+
+        job = CalendarSyncJob(user_id=user_id, task_ids=task_ids, automatic=automatic)
+        db.add(job)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            result = await db.execute(
+                select(CalendarSyncJob.id).where(
+                    CalendarSyncJob.user_id == user_id,
+                    CalendarSyncJob.status.in_(ACTIVE_SYNC_STATUSES),
+                )
+            )
+            raise SyncAlreadyRunning(result.scalar_one_or_none())
+
+        task = create_background_task(self._run(job.id))
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+        return job
+
+    async def _prune_finished_jobs(self, user_id: uuid.UUID, db: AsyncSession) -> None:
+        await db.execute(
+            delete(CalendarSyncJob)
+            .where(
+                CalendarSyncJob.user_id == user_id,
+                CalendarSyncJob.status.notin_(ACTIVE_SYNC_STATUSES),
+                or_(
+                    CalendarSyncJob.automatic.is_(True),
+                    CalendarSyncJob.finished_at < datetime.utcnow() - self.retention,
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _fail_stale_jobs(self, user_id: uuid.UUID, db: AsyncSession) -> None:
+        now = datetime.utcnow()
+        await db.execute(
+            update(CalendarSyncJob)
+            .where(
+                CalendarSyncJob.user_id == user_id,
+                CalendarSyncJob.status.in_(ACTIVE_SYNC_STATUSES),
+                CalendarSyncJob.heartbeat_at < now - self.stale_after,
+            )
+            .values(status=SyncJobStatusEnum.FAILED, error_message="Sync stopped responding", finished_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _set(self, job_id: uuid.UUID, **values) -> None:
+        """Write job fields in a short transaction of their own"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(CalendarSyncJob)
+                .where(CalendarSyncJob.id == job_id)
+                .values(heartbeat_at=datetime.utcnow(), **values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    async def _run(self, job_id: uuid.UUID) -> None:
+        # Keep the heartbeat fresh while queued behind other jobs
+        while True:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.stale_after.total_seconds() / 2)
+                break
+            except TimeoutError:
+                await self._set(job_id)
+
+        try:
+            await self._sync(job_id)
+        except Exception as e:
+            print(f"Error in calendar sync job {job_id}: {e}")
+            await self._set(
+                job_id,
+                status=SyncJobStatusEnum.FAILED,
+                error_message=str(e)[:1000],
+                finished_at=datetime.utcnow(),
+            )
+        finally:
+            self._slots.release()
+
+    async def _sync(self, job_id: uuid.UUID) -> None:
+        # Load what to sync in a short session; none is held while Google is called
+        async with AsyncSessionLocal() as db:
+            job = await db.get(CalendarSyncJob, job_id)
+            user_id = job.user_id
+
+            # Fail fast if the user isn't connected
+            await calendar_clients.get_credentials(user_id, db)
+
+            # Tasks with an event to create/update, or an event to remove
+            query = select(Task).where(
+                and_(
+                    Task.user_id == user_id,
+                    or_(Task.due_date.isnot(None), Task.google_event_id.isnot(None)),
+                )
+            )
+            tombstones = select(TaskTombstone.task_id, TaskTombstone.google_event_id).where(
+                TaskTombstone.user_id == user_id,
+                TaskTombstone.google_event_id.isnot(None),
+            )
+            if job.task_ids:
+                query = query.where(Task.id.in_(job.task_ids))
+                tombstones = tombstones.where(TaskTombstone.task_id.in_(job.task_ids))
+            result = await db.execute(query)
+            tasks = [CalendarTask.from_task(task) for task in result.scalars().all()]
+            result = await db.execute(tombstones)
+            tasks += [
+                CalendarTask(id=task_id, google_event_id=event_id, deleted=True)
+                for task_id, event_id in result.all()
+            ]
+
+        await self._set(
+            job_id,
+            status=SyncJobStatusEnum.RUNNING,
+            total=len(tasks),
+            started_at=datetime.utcnow(),
+        )
+
+        # The sync only replaces this dict; the loop below reads it
+        progress = {}
+
+        def on_progress(counts: dict) -> None:
+            nonlocal progress
+            progress = counts
+
+        sync = asyncio.create_task(
+            sync_tasks_to_calendar(tasks, calendar_clients.token_getter(user_id), on_progress)
+        )
+        try:
+            while True:
+                done, _ = await asyncio.wait({sync}, timeout=PROGRESS_INTERVAL_SECONDS)
+                if done:
+                    break
+                await self._set(job_id, **progress)
+        finally:
+            sync.cancel()
+        counts = sync.result()
+
+        async with AsyncSessionLocal() as db:
+            await save_sync_state(tasks, db)
+            await db.commit()
+
+        await self._set(
+            job_id,
+            status=SyncJobStatusEnum.COMPLETED,
+            finished_at=datetime.utcnow(),
+            **counts,
+        )
+
+    async def shutdown(self) -> None:
+        """Cancel in-flight jobs; their heartbeats go stale and they are failed later"""
+        for task in list(self._jobs):
+            task.cancel()
+        for task in list(self._jobs):
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
+calendar_sync_runner = CalendarSyncRunner(
+    # At most half the pool's persistent connections, even if configured higher
+    max_jobs=max(1, min(settings.CALENDAR_SYNC_WORKERS, settings.DB_POOL_SIZE // 2)),
+    stale_after=timedelta(seconds=settings.CALENDAR_SYNC_STALE_SECONDS),
+    retention=timedelta(hours=settings.CALENDAR_SYNC_JOB_RETENTION_HOURS),
+)
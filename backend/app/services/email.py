@@ -1,14 +1,15 @@
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
-import aiosmtplib
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.models.email_outbox import EmailOutbox
 
 
-async def send_email(to_email: str, subject: str, html_content: str) -> bool:
+def build_message(to_email: str, subject: str, html_content: str) -> MIMEMultipart:
     """
-    Send an email using Mailtrap SMTP
+    Build a MIME message for an HTML email
     
     Args:
         to_email: Recipient email address
@@ -16,45 +17,44 @@ async def send_email(to_email: str, subject: str, html_content: str) -> bool:
         html_content: HTML content of the email
     
     Returns:
-        True if email sent successfully, False otherwise
+        Message ready to send
     """
-    try:
-        message = MIMEMultipart("alternative")
-        message["From"] = settings.FROM_EMAIL
-        message["To"] = to_email
-        message["Subject"] = subject
-        
-        # Attach HTML content
-        html_part = MIMEText(html_content, "html")
-        message.attach(html_part)
-        
-        # Send email using Mailtrap SMTP
-        async with aiosmtplib.SMTP(
-            hostname=settings.SMTP_HOST,
-            port=settings.SMTP_PORT,
-            username=settings.SMTP_USER,
-            password=settings.SMTP_PASSWORD,
-            use_tls=False,  # Mailtrap sandbox doesn't use TLS
-        ) as smtp:
-            await smtp.send_message(message)
-        
-        return True
-    except Exception as e:
-        print(f"Error sending email: {e}")
-        return False
+    message = MIMEMultipart("alternative")
+    message["From"] = settings.FROM_EMAIL
+    message["To"] = to_email
+    message["Subject"] = subject
+    
+    # Attach HTML content
+    html_part = MIMEText(html_content, "html")
+    message.attach(html_part)
+    
+    return message
+
+
+def enqueue_email(db: AsyncSession, to_email: str, subject: str, html_content: str) -> None:
+    """
+    Queue an email in the outbox as part of the caller's transaction
+    
+    The background sender delivers it after the transaction commits.
+    
+    Args:
+        db: Database session
+        to_email: Recipient email address
+        subject: Email subject line
+        html_content: HTML content of the email
+    """
+    db.add(EmailOutbox(to_email=to_email, subject=subject, html_content=html_content))
 
 
-async def send_verification_email(to_email: str, username: str, verification_token: str) -> bool:
+def queue_verification_email(db: AsyncSession, to_email: str, username: str, verification_token: str) -> None:
     """
-    Send email verification link
+    Queue email verification link
     
     Args:
+        db: Database session
         to_email: User's email address
         username: User's username
         verification_token: Verification token
-    
-    Returns:
-        True if email sent successfully
     """
     verification_link = f"{settings.FRONTEND_URL}/verify-email?token={verification_token}"
     
@@ -96,20 +96,18 @@ async def send_verification_email(to_email: str, username: str, verification_tok
     </html>
     """
     
-    return await send_email(to_email, "Verify Your Email - Task Manager", html_content)
+    enqueue_email(db, to_email, "Verify Your Email - Task Manager", html_content)
 
 
-async def send_password_reset_email(to_email: str, username: str, reset_token: str) -> bool:
+def queue_password_reset_email(db: AsyncSession, to_email: str, username: str, reset_token: str) -> None:
     """
-    Send password reset link
+    Queue password reset link
     
     Args:
+        db: Database session
         to_email: User's email address
         username: User's username
         reset_token: Password reset token
-    
-    Returns:
-        True if email sent successfully
     """
     reset_link = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
     
@@ -151,4 +149,4 @@ async def send_password_reset_email(to_email: str, username: str, reset_token: s
     </html>
     """
     
-    return await send_email(to_email, "Reset Your Password - Task Manager", html_content)
+    enqueue_email(db, to_email, "Reset Your Password - Task Manager", html_content)
@@ -0,0 +1,284 @@
+"""Background sender that drains the email outbox over a persistent SMTP connection"""
+import asyncio
+import contextlib
+import time
+from datetime import datetime, timedelta
+from email.message import Message
+
+import aiosmtplib
+from sqlalchemy import delete, select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.email_outbox import EmailOutbox, EmailStatusEnum
+from app.services.email import build_message
+
+# How long a claimed message is hidden from other senders while in flight
+CLAIM_LEASE = timedelta(minutes=5)
+
+# Longest one message may take to send, including a reconnect; no send
+# starts later than this before its lease runs out
+SEND_TIMEOUT = timedelta(seconds=60)
+
+# Upper bound for retry backoff
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+# How often sent messages past their retention are deleted, and how many
+# rows one delete statement removes
+PRUNE_INTERVAL = timedelta(hours=1)
+PRUNE_BATCH_SIZE = 5000
+
+
+class PersistentSMTP:
+    """
+    Long-lived SMTP session reused across messages
+
+    Connects (and logs in) lazily, reconnects once if the server dropped
+    the session, and closes it after SMTP_IDLE_TIMEOUT_SECONDS of disuse
+    so relays don't hold half-dead connections.
+    """
+
+    def __init__(self):
+        self._smtp: aiosmtplib.SMTP | None = None
+        self._last_used = 0.0
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USER or None,
+            password=settings.SMTP_PASSWORD or None,
+            use_tls=False,  # Mailtrap sandbox doesn't use TLS
+        )
+        await smtp.connect()
+        return smtp
+
+    async def send(self, message: Message) -> None:
+        """Send a message, reusing the open session when possible"""
+        idle = time.monotonic() - self._last_used
+        if self._smtp is not None and (not self._smtp.is_connected or idle > settings.SMTP_IDLE_TIMEOUT_SECONDS):
+            await self.close()
+
+        if self._smtp is None:
+            self._smtp = await self._connect()
+
+        try:
+            await self._smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # Server closed an idle session; retry once on a fresh one
+            self._smtp = await self._connect()
+            await self._smtp.send_message(message)
+        self._last_used = time.monotonic()
+
+    async def close(self) -> None:
+        """Close the session if open"""
+        if self._smtp is None:
+            return
+        smtp, self._smtp = self._smtp, None
+        with contextlib.suppress(aiosmtplib.SMTPException, OSError):
+            if smtp.is_connected:
+                await smtp.quit()
+
+
+class EmailOutboxWorker:
+    """
+    Drains pending outbox rows in batches
+
+    Messages are claimed with FOR UPDATE SKIP LOCKED plus a lease, so
+    several app workers can run senders side by side. Failed sends are
+    retried with exponential backoff until EMAIL_MAX_ATTEMPTS. Sent
+    messages are deleted once they are older than `retention`.
+    """
+
+    def __init__(self, batch_size: int, poll_interval: float, max_attempts: int, retention: timedelta):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self._next_prune = 0.0
+        self._smtp = PersistentSMTP()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._sent = 0
+        self._failed = 0
+        self._retried = 0
+
+    def start(self) -> None:
+        """Start the background drain loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the drain loop and close the SMTP session"""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self._smtp.close()
+
+    def notify(self) -> None:
+        """Wake the sender after new messages were committed"""
+        self._wakeup.set()
+
+    def metrics(self) -> dict:
+        """Delivery counters since startup"""
+        return {"sent": self._sent, "retried": self._retried, "failed": self._failed}
+
+    async def _run(self) -> None:
+        while True:
+            if time.monotonic() >= self._next_prune:
+                self._next_prune = time.monotonic() + PRUNE_INTERVAL.total_seconds()
+                try:
+                    await self.prune_sent()
+                except Exception as e:
+                    print(f"Error pruning email outbox: {e}")
+
+            try:
+                processed = await self.drain_once()
+            except Exception as e:
+                print(f"Email outbox error: {e}")
+                processed = 0
+
+            # A full batch means more may be waiting
+            if processed >= self.batch_size:
+                continue
+
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            self._wakeup.clear()
+
+    async def drain_once(self) -> int:
+        """
+        Claim and send one batch of due messages
+
+        Each message is marked sent (or rescheduled) as soon as its send
+        finishes, so a slow batch never re-sends what already went out. If
+        the batch runs close to the end of its lease, the unsent rest is
+        handed back before another sender could claim it.
+
+        Returns:
+            Number of messages processed
+        """
+        claimed = await self._claim()
+        if not claimed:
+            return 0
+
+        deadline = time.monotonic() + (CLAIM_LEASE - SEND_TIMEOUT).total_seconds()
+        for index, row in enumerate(claimed):
+            if time.monotonic() > deadline:
+                await self._release([unsent.id for unsent in claimed[index:]])
+                return index
+
+            try:
+                async with asyncio.timeout(SEND_TIMEOUT.total_seconds()):
+                    await self._smtp.send(build_message(row.to_email, row.subject, row.html_content))
+            except Exception as e:
+                if isinstance(e, TimeoutError):
+                    # The session is mid-command; start over on a fresh one
+                    await self._smtp.close()
+                await self._record_failure(row, str(e) or type(e).__name__)
+            else:
+                await self._mark_sent(row.id)
+
+        return len(claimed)
+
+    async def prune_sent(self) -> int:
+        """
+        Delete sent messages older than the retention window
+
+        Rows go in batches of PRUNE_BATCH_SIZE, each its own transaction,
+        so a large backlog never holds locks for long.
+
+        Returns:
+            Number of messages deleted
+        """
+        cutoff = datetime.utcnow() - self.retention
+        deleted = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                expired = (
+                    select(EmailOutbox.id)
+                    .where(EmailOutbox.status == EmailStatusEnum.SENT, EmailOutbox.sent_at < cutoff)
+                    .limit(PRUNE_BATCH_SIZE)
+                )
+                result = await db.execute(
+                    delete(EmailOutbox)
+                    .where(EmailOutbox.id.in_(expired.scalar_subquery()))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            deleted += result.rowcount
+            if result.rowcount < PRUNE_BATCH_SIZE:
+                return deleted
+
+    async def _claim(self) -> list:
+        """Lease up to batch_size due messages to this sender"""
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            due = (
+                select(EmailOutbox.id)
+                .where(
+                    EmailOutbox.status == EmailStatusEnum.PENDING,
+                    EmailOutbox.next_attempt_at <= now,
+                )
+                .order_by(EmailOutbox.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(due.scalar_subquery()))
+                .values(attempts=EmailOutbox.attempts + 1, next_attempt_at=now + CLAIM_LEASE)
+                .returning(
+                    EmailOutbox.id,
+                    EmailOutbox.to_email,
+                    EmailOutbox.subject,
+                    EmailOutbox.html_content,
+                    EmailOutbox.attempts,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            claimed = result.all()
+            await db.commit()
+        return claimed
+
+    async def _update(self, statement) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(statement.execution_options(synchronize_session=False))
+            await db.commit()
+
+    async def _mark_sent(self, message_id) -> None:
+        await self._update(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == message_id)
+            .values(status=EmailStatusEnum.SENT, sent_at=datetime.utcnow(), last_error=None)
+        )
+        self._sent += 1
+
+    async def _record_failure(self, row, error: str) -> None:
+        values = {"last_error": error[:1000]}
+        if row.attempts >= self.max_attempts:
+            values["status"] = EmailStatusEnum.FAILED
+            self._failed += 1
+        else:
+            delay = timedelta(seconds=settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (row.attempts - 1))
+            values["next_attempt_at"] = datetime.utcnow() + min(delay, MAX_RETRY_DELAY)
+            self._retried += 1
+        await self._update(update(EmailOutbox).where(EmailOutbox.id == row.id).values(**values))
+
+    async def _release(self, message_ids: list) -> None:
+        """Make claimed but unsent messages due again, without counting the attempt"""
+        await self._update(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(message_ids))
+            .values(attempts=EmailOutbox.attempts - 1, next_attempt_at=datetime.utcnow())
+        )
+
+
+email_outbox_worker = EmailOutboxWorker(
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.EMAIL_OUTBOX_POLL_SECONDS,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retention=timedelta(hours=settings.EMAIL_OUTBOX_RETENTION_HOURS),
+)
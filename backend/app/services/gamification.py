@@ -1,11 +1,17 @@
 import math
-from datetime import date
+import uuid
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 
-from sqlalchemy import select
+from sqlalchemy import Integer, Row, case, cast, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.gamification import Achievement, UserAchievement, UserStats
 from app.models.task import PriorityEnum
+from app.services.leaderboard import leaderboards
+from app.services.xp_ledger import record_xp
 
 # XP Calculation Constants
 BASE_XP = 10
@@ -18,6 +24,78 @@ STREAK_XP_MULTIPLIER = 5
 MAX_STREAK_BONUS = 50
 
 
+@dataclass(frozen=True)
+class CatalogAchievement:
+    """Immutable in-process copy of an Achievement row"""
+    id: uuid.UUID
+    name: str
+    requirement_type: str
+    requirement_value: int
+    xp_reward: int
+
+
+class AchievementCatalog:
+    """
+    Achievement definitions indexed by requirement type
+
+    Each type keeps its thresholds sorted, so the achievements crossed by
+    moving a counter from `old` to `new` are a bisect slice.
+    """
+
+    def __init__(self, achievements: list[CatalogAchievement]):
+        self._by_type: dict[str, list[CatalogAchievement]] = {}
+        for achievement in sorted(achievements, key=lambda a: a.requirement_value):
+            self._by_type.setdefault(achievement.requirement_type, []).append(achievement)
+        self._thresholds = {
+            requirement_type: [a.requirement_value for a in entries]
+            for requirement_type, entries in self._by_type.items()
+        }
+
+    def crossed(self, requirement_type: str, old_value: int, new_value: int) -> list[CatalogAchievement]:
+        """Achievements with old_value < requirement_value <= new_value"""
+        thresholds = self._thresholds.get(requirement_type)
+        if not thresholds or new_value <= old_value:
+            return []
+        start = bisect_right(thresholds, old_value)
+        end = bisect_right(thresholds, new_value)
+        return self._by_type[requirement_type][start:end]
+
+
+_achievement_catalog: AchievementCatalog | None = None
+
+
+async def get_achievement_catalog(db: AsyncSession) -> AchievementCatalog:
+    """
+    Get the cached achievement catalog, loading it on first use
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Achievement catalog
+    """
+    global _achievement_catalog
+    if _achievement_catalog is None:
+        result = await db.execute(select(Achievement))
+        _achievement_catalog = AchievementCatalog([
+            CatalogAchievement(
+                id=achievement.id,
+                name=achievement.name,
+                requirement_type=achievement.requirement_type,
+                requirement_value=achievement.requirement_value,
+                xp_reward=achievement.xp_reward,
+            )
+            for achievement in result.scalars().all()
+        ])
+    return _achievement_catalog
+
+
+def invalidate_achievement_catalog() -> None:
+    """Drop the cached catalog after achievement definitions change"""
+    global _achievement_catalog
+    _achievement_catalog = None
+
+
 def calculate_xp_reward(priority: PriorityEnum, current_streak: int) -> int:
     """
     Calculate XP reward for completing a task
@@ -53,32 +131,9 @@ def calculate_level(total_xp: int) -> int:
     return 1 + math.floor(math.sqrt(total_xp / 100))
 
 
-async def update_streak(stats: UserStats, db: AsyncSession) -> None:
-    """
-    Update user's streak based on current date
-    
-    Args:
-        stats: User stats object
-        db: Database session
-    """
-    today = date.today()
-    
-    if stats.last_completion_date is None:
-        # First task ever
-        stats.current_streak = 1
-        stats.longest_streak = 1
-    elif stats.last_completion_date == today:
-        # Already completed a task today, no change
-        pass
-    elif (today - stats.last_completion_date).days == 1:
-        # Consecutive day
-        stats.current_streak += 1
-        stats.longest_streak = max(stats.longest_streak, stats.current_streak)
-    else:
-        # Streak broken
-        stats.current_streak = 1
-    
-    stats.last_completion_date = today
+def level_expression(total_xp):
+    """SQL counterpart of calculate_level for use inside UPDATE statements"""
+    return 1 + cast(func.floor(func.sqrt(total_xp / 100.0)), Integer)
 
 
 async def award_xp(
@@ -97,108 +152,213 @@ async def award_xp(
     Returns:
         Dictionary with XP details and level up status
     """
-    # Get or create user stats
-    result = await db.execute(
-        select(UserStats).where(UserStats.user_id == user_id)
-    )
-    stats = result.scalar_one_or_none()
+    return await award_xp_batch(user_id, [priority], db)
+
+
+async def award_xp_batch(
+    user_id: str,
+    priorities: list[PriorityEnum],
+    db: AsyncSession
+) -> dict:
+    """
+    Award XP to user for completing several tasks at once
+    
+    The streak, XP, task count and level are updated by one atomic
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING, so concurrent
+    completions for the same user never lose updates and a missing stats
+    row is created race-free.
     
-    if not stats:
-        # Create stats if not exists
-        stats = UserStats(user_id=user_id)
-        db.add(stats)
-        await db.flush()
+    Streak rules: the first completion of a day extends yesterday's streak
+    or restarts it at 1; later completions that day leave it unchanged.
+    Every task in the batch gets the streak bonus for the resulting streak.
     
-    # Update streak
-    await update_streak(stats, db)
+    Args:
+        user_id: User's ID
+        priorities: Priority of each completed task
+        db: Database session
     
-    # Calculate XP
-    xp_earned = calculate_xp_reward(priority, stats.current_streak)
-    old_level = stats.level
+    Returns:
+        Dictionary with aggregated XP details and level up status
+    """
+    if not priorities:
+        result = await db.execute(
+            select(UserStats.total_xp, UserStats.level).where(UserStats.user_id == user_id)
+        )
+        row = result.one_or_none()
+        return {
+            "xp_earned": 0,
+            "total_xp": row.total_xp if row else 0,
+            "level": row.level if row else 1,
+            "level_up": False,
+            "new_achievements": [],
+        }
     
-    # Update stats
-    stats.total_xp += xp_earned
-    stats.tasks_completed += 1
-    stats.level = calculate_level(stats.total_xp)
+    today = date.today()
+    count = len(priorities)
+    
+    # XP before the streak bonus, and XP for a user's very first completion
+    base_xp = sum(calculate_xp_reward(priority, 0) for priority in priorities)
+    first_xp = sum(calculate_xp_reward(priority, 1) for priority in priorities)
+    
+    # Existing row: derive the new streak, then XP from it
+    existing = UserStats.__table__.c
+    new_streak = case(
+        (existing.last_completion_date == today, existing.current_streak),
+        (existing.last_completion_date == today - timedelta(days=1), existing.current_streak + 1),
+        else_=1,
+    )
+    new_total_xp = existing.total_xp + base_xp + count * func.least(
+        new_streak * STREAK_XP_MULTIPLIER, MAX_STREAK_BONUS
+    )
+    
+    insert_stmt = pg_insert(UserStats).values(
+        user_id=user_id,
+        total_xp=first_xp,
+        level=calculate_level(first_xp),
+        tasks_completed=count,
+        current_streak=1,
+        longest_streak=1,
+        last_completion_date=today,
+    )
+    result = await db.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={
+                "current_streak": new_streak,
+                "longest_streak": func.greatest(existing.longest_streak, new_streak),
+                "total_xp": new_total_xp,
+                "level": level_expression(new_total_xp),
+                "tasks_completed": existing.tasks_completed + count,
+                "last_completion_date": today,
+                "updated_at": datetime.utcnow(),
+            },
+        ).returning(
+            UserStats.total_xp,
+            UserStats.level,
+            UserStats.tasks_completed,
+            UserStats.current_streak,
+        )
+    )
+    stats = result.one()
+    
+    xp_earned = sum(calculate_xp_reward(priority, stats.current_streak) for priority in priorities)
+    
+    # Pre-award values, recovered from the returned row. Level is always
+    # derived from total XP; the streak moved by at most +1, and a lower
+    # bound is enough for threshold crossing.
+    old_level = calculate_level(stats.total_xp - xp_earned)
+    old_tasks_completed = stats.tasks_completed - count
+    old_streak = stats.current_streak - 1
     
     level_up = stats.level > old_level
     
     # Check for new achievements
-    new_achievements = await check_achievements(user_id, stats, db)
+    unlocked, total_xp, level = await check_achievements(
+        user_id, stats, old_tasks_completed, old_streak, old_level, db
+    )
+    
+    # Ledger entries for task XP and achievement bonuses, in the same transaction
+    events = [
+        {"xp": calculate_xp_reward(priority, stats.current_streak), "source": "task"}
+        for priority in priorities
+    ] + [
+        {"xp": achievement.xp_reward, "source": "achievement", "achievement_id": achievement.id}
+        for achievement in unlocked
+        if achievement.xp_reward
+    ]
+    period_xp = await record_xp(user_id, events, today, db)
     
     await db.commit()
     
+    leaderboards.record(uuid.UUID(str(user_id)), total_xp, period_xp)
+    
     return {
         "xp_earned": xp_earned,
-        "total_xp": stats.total_xp,
-        "level": stats.level,
+        "total_xp": total_xp,
+        "level": level,
         "level_up": level_up,
-        "new_achievements": new_achievements,
+        "new_achievements": [achievement.name for achievement in unlocked],
     }
 
 
 async def check_achievements(
     user_id: str,
-    stats: UserStats,
+    stats: Row,
+    old_tasks_completed: int,
+    old_streak: int,
+    old_level: int,
     db: AsyncSession
-) -> list[str]:
+) -> tuple[list[CatalogAchievement], int, int]:
     """
-    Check and unlock achievements for user
+    Unlock achievements whose thresholds were crossed by this award
+    
+    Only achievements between the old and new counter values are
+    candidates, so UserAchievement is only touched when a threshold was
+    actually crossed. Unlocks use ON CONFLICT DO NOTHING and bonus XP is
+    added with an atomic UPDATE, so concurrent awards can't double-unlock.
     
     Args:
         user_id: User's ID
-        stats: User stats
+        stats: New total_xp, level, tasks_completed and current_streak
+        old_tasks_completed: tasks_completed before the award
+        old_streak: current_streak before the award (lower bound)
+        old_level: level before the award
         db: Database session
     
     Returns:
-        List of newly unlocked achievement names
+        Tuple of (newly unlocked achievements, total_xp, level)
     """
-    # Get all achievements
-    result = await db.execute(select(Achievement))
-    all_achievements = result.scalars().all()
+    catalog = await get_achievement_catalog(db)
     
-    # Get user's unlocked achievements
-    result = await db.execute(
-        select(UserAchievement.achievement_id).where(
-            UserAchievement.user_id == user_id
-        )
+    total_xp, level = stats.total_xp, stats.level
+    candidates = (
+        catalog.crossed("tasks_count", old_tasks_completed, stats.tasks_completed)
+        + catalog.crossed("streak", old_streak, stats.current_streak)
     )
-    unlocked_ids = {row for row in result.scalars().all()}
-    
+    checked_level = old_level
     newly_unlocked = []
     
-    for achievement in all_achievements:
-        # Skip if already unlocked
-        if achievement.id in unlocked_ids:
-            continue
+    # Repeats only when bonus XP pushes the level over another threshold
+    while True:
+        candidates += catalog.crossed("level", checked_level, level)
+        checked_level = level
+        if not candidates:
+            break
+        
+        # Rows that already exist (e.g. from an earlier streak) are skipped
+        result = await db.execute(
+            pg_insert(UserAchievement)
+            .values([
+                {"id": uuid.uuid4(), "user_id": user_id, "achievement_id": achievement.id}
+                for achievement in candidates
+            ])
+            .on_conflict_do_nothing(constraint="unique_user_achievement")
+            .returning(UserAchievement.achievement_id)
+        )
+        unlocked_ids = set(result.scalars().all())
+        unlocked = [achievement for achievement in candidates if achievement.id in unlocked_ids]
+        candidates = []
+        
+        if not unlocked:
+            break
         
-        # Check if requirement met
-        unlocked = False
-        if achievement.requirement_type == "tasks_count":
-            unlocked = stats.tasks_completed >= achievement.requirement_value
-        elif achievement.requirement_type == "streak":
-            unlocked = stats.current_streak >= achievement.requirement_value
-        elif achievement.requirement_type == "level":
-            unlocked = stats.level >= achievement.requirement_value
+        newly_unlocked.extend(unlocked)
         
-        if unlocked:
-            # Unlock achievement
-            user_achievement = UserAchievement(
-                user_id=user_id,
-                achievement_id=achievement.id
+        # Award XP bonus
+        bonus = sum(achievement.xp_reward for achievement in unlocked)
+        result = await db.execute(
+            update(UserStats)
+            .where(UserStats.user_id == user_id)
+            .values(
+                total_xp=UserStats.total_xp + bonus,
+                level=level_expression(UserStats.total_xp + bonus),
             )
-            db.add(user_achievement)
-            
-            # Award XP bonus
-            stats.total_xp += achievement.xp_reward
-            stats.level = calculate_level(stats.total_xp)
-            
-            newly_unlocked.append(achievement.name)
-    
-    if newly_unlocked:
-        await db.flush()
-    
-    return newly_unlocked
+            .returning(UserStats.total_xp, UserStats.level)
+            .execution_options(synchronize_session=False)
+        )
+        total_xp, level = result.one()
+    
+    return newly_unlocked, total_xp, level
 
 
 async def initialize_achievements(db: AsyncSession) -> None:
@@ -287,3 +447,5 @@ async def initialize_achievements(db: AsyncSession) -> None:
             db.add(achievement)
     
     await db.commit()
+    
+    invalidate_achievement_catalog()
@@ -0,0 +1,285 @@
+"""Async HTTP client for Google OAuth and the Calendar API over one shared connection pool"""
+import email
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+DEFAULT_CALENDAR_API = "https://www.googleapis.com/calendar/v3/"
+
+# Rate limits and transient server errors worth retrying
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+
+
+class GoogleAPIError(Exception):
+    """Non-2xx answer from Google (or from one call inside a batch)"""
+
+    def __init__(self, status: int, message: str, retry_after: float = 0.0):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """Rate limits (429, or 403 with a rate-limit reason) and 5xx"""
+        if self.status in RETRYABLE_STATUSES:
+            return True
+        return self.status == 403 and any(reason in self.message for reason in RATE_LIMIT_REASONS)
+
+
+@dataclass
+class CalendarCall:
+    """One Calendar API call, relative to the API root (e.g. 'calendars/primary/events')"""
+    method: str
+    path: str
+    params: dict = field(default_factory=dict)
+    body: dict | None = None
+
+
+@dataclass
+class CalendarResult:
+    """Outcome of one call inside a batch"""
+    status: int
+    data: dict
+    error: GoogleAPIError | None = None
+
+
+def _retry_after(headers) -> float:
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _error_from(status: int, content: str | bytes, headers) -> GoogleAPIError:
+    if isinstance(content, bytes):
+        content = content.decode(errors="replace")
+    return GoogleAPIError(status, content[:1000], _retry_after(headers))
+
+
+class GoogleAPIClient:
+    """
+    Non-blocking Google client
+
+    All requests share one httpx.AsyncClient, so connections to Google
+    stay alive and pooled across every user's sync. The client is created
+    lazily inside the running loop and closed on shutdown.
+    """
+
+    def __init__(self, max_connections: int, timeout: float):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    @property
+    def calendar_root(self) -> str:
+        """Calendar API root, overridable for a local fake"""
+        root = settings.GOOGLE_CALENDAR_API_ENDPOINT or DEFAULT_CALENDAR_API
+        return root if root.endswith("/") else root + "/"
+
+    @property
+    def batch_uri(self) -> str:
+        root = urlsplit(self.calendar_root)
+        return f"{root.scheme}://{root.netloc}/batch/calendar/v3"
+
+    # --- OAuth ---
+
+    async def _token_request(self, data: dict) -> dict:
+        response = await self.client.post(
+            settings.GOOGLE_TOKEN_URI,
+            data={
+                "client_id": settings.GOOGLE_CLIENT_ID,
+                "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                **data,
+            },
+        )
+        if response.status_code != 200:
+            raise _error_from(response.status_code, response.content, response.headers)
+        tokens = response.json()
+        tokens["token_expiry"] = datetime.utcnow() + timedelta(seconds=int(tokens.get("expires_in", 3600)))
+        return tokens
+
+    async def exchange_code(self, code: str) -> dict:
+        """
+        Exchange an authorization code for tokens
+
+        Returns:
+            Dictionary with access_token, refresh_token (when granted) and token_expiry
+        """
+        tokens = await self._token_request({
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+        })
+        return {
+            "access_token": tokens["access_token"],
+            "refresh_token": tokens.get("refresh_token"),
+            "token_expiry": tokens["token_expiry"],
+        }
+
+    async def refresh_access_token(self, refresh_token: str) -> tuple[str, datetime]:
+        """
+        Get a new access token
+
+        Returns:
+            Tuple of (access_token, expiry)
+        """
+        tokens = await self._token_request({
+            "refresh_token": refresh_token,
+            "grant_type": "refresh_token",
+        })
+        return tokens["access_token"], tokens["token_expiry"]
+
+    # --- Calendar ---
+
+    async def request(self, access_token: str, call: CalendarCall) -> dict:
+        """Send one Calendar call; raises GoogleAPIError on failure"""
+        response = await self.client.request(
+            call.method,
+            self.calendar_root + call.path,
+            params=call.params or None,
+            json=call.body,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        if response.status_code >= 300:
+            raise _error_from(response.status_code, response.content, response.headers)
+        return response.json() if response.content else {}
+
+    async def insert_event(self, access_token: str, body: dict, calendar_id: str = "primary") -> dict:
+        return await self.request(access_token, CalendarCall("POST", f"calendars/{calendar_id}/events", body=body))
+
+    async def update_event(self, access_token: str, event_id: str, body: dict, calendar_id: str = "primary") -> dict:
+        return await self.request(
+            access_token, CalendarCall("PUT", f"calendars/{calendar_id}/events/{event_id}", body=body)
+        )
+
+    async def delete_event(self, access_token: str, event_id: str, calendar_id: str = "primary") -> None:
+        await self.request(access_token, CalendarCall("DELETE", f"calendars/{calendar_id}/events/{event_id}"))
+
+    async def list_events(self, access_token: str, calendar_id: str = "primary", **params) -> tuple[list[dict], str | None]:
+        """
+        List events, following pagination
+
+        Returns:
+            Tuple of (events, nextSyncToken)
+        """
+        events = []
+        params = dict(params)
+        while True:
+            page = await self.request(access_token, CalendarCall("GET", f"calendars/{calendar_id}/events", params=params))
+            events.extend(page.get("items", []))
+            if not page.get("nextPageToken"):
+                return events, page.get("nextSyncToken")
+            params["pageToken"] = page["nextPageToken"]
+
+    async def watch_events(
+        self, access_token: str, channel_id: str, address: str, token: str, calendar_id: str = "primary"
+    ) -> dict:
+        """
+        Open a push channel for event changes
+
+        Returns:
+            Channel resource with resourceId and expiration (ms since epoch)
+        """
+        return await self.request(
+            access_token,
+            CalendarCall(
+                "POST",
+                f"calendars/{calendar_id}/events/watch",
+                body={"id": channel_id, "type": "web_hook", "address": address, "token": token},
+            ),
+        )
+
+    async def stop_channel(self, access_token: str, channel_id: str, resource_id: str) -> None:
+        await self.request(
+            access_token, CalendarCall("POST", "channels/stop", body={"id": channel_id, "resourceId": resource_id})
+        )
+
+    async def batch(self, access_token: str, calls: list[CalendarCall]) -> list[CalendarResult]:
+        """
+        Send up to 50 calls in one multipart/mixed round trip
+
+        Returns:
+            One result per call, in order; per-call failures are in .error
+
+        Raises:
+            GoogleAPIError: The batch request itself failed
+        """
+        boundary = f"batch_{uuid.uuid4().hex}"
+        root_path = urlsplit(self.calendar_root).path
+        parts = []
+        for index, call in enumerate(calls):
+            target = root_path + call.path + (f"?{urlencode(call.params)}" if call.params else "")
+            body = json.dumps(call.body) if call.body is not None else ""
+            parts.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <item-{index}>\r\n\r\n"
+                f"{call.method} {target} HTTP/1.1\r\n"
+                f"Content-Type: application/json\r\n\r\n"
+                f"{body}\r\n"
+            )
+        parts.append(f"--{boundary}--\r\n")
+
+        response = await self.client.post(
+            self.batch_uri,
+            content="".join(parts).encode(),
+            headers={
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": f"multipart/mixed; boundary={boundary}",
+            },
+        )
+        if response.status_code >= 300:
+            raise _error_from(response.status_code, response.content, response.headers)
+
+        message = email.message_from_bytes(
+            f"Content-Type: {response.headers['content-type']}\r\n\r\n".encode() + response.content
+        )
+        results: list[CalendarResult | None] = [None] * len(calls)
+        for part in message.get_payload():
+            index = int(part["Content-ID"].strip("<>").rsplit("-", 1)[1])
+            payload = part.get_payload()
+            status_line, rest = payload.split("\n", 1)
+            status = int(status_line.split(" ", 2)[1])
+            inner = email.message_from_string(rest)
+            content = inner.get_payload() or ""
+            if status >= 300:
+                results[index] = CalendarResult(status, {}, _error_from(status, content, inner))
+            else:
+                results[index] = CalendarResult(status, json.loads(content) if content.strip() else {})
+
+        return [
+            result or CalendarResult(0, {}, GoogleAPIError(0, "No response for batch item"))
+            for result in results
+        ]
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+google_api = GoogleAPIClient(
+    max_connections=settings.GOOGLE_API_MAX_CONNECTIONS,
+    timeout=settings.GOOGLE_API_TIMEOUT_SECONDS,
+)
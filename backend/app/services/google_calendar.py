@@ -1,11 +1,17 @@
 """Google Calendar Integration Service"""
-from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import json
+import random
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta, timezone
 
-from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 
 from app.core.config import settings
+from app.services.google_api import CalendarCall, GoogleAPIError, google_api
 
 SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
 
@@ -18,7 +24,7 @@ def get_oauth_flow() -> Flow:
             "client_secret": settings.GOOGLE_CLIENT_SECRET,
             "redirect_uris": [settings.GOOGLE_REDIRECT_URI],
             "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
+            "token_uri": settings.GOOGLE_TOKEN_URI,
         }
     }
     flow = Flow.from_client_config(
@@ -46,133 +52,344 @@ def get_auth_url() -> str:
     return auth_url
 
 
-def exchange_code(code: str) -> dict:
+async def exchange_code(code: str) -> dict:
     """Exchange authorization code for tokens"""
-    flow = get_oauth_flow()
+    return await google_api.exchange_code(code)
+
+
+# Google caps a batch at 50 calls; each batch is one HTTP round trip
+BATCH_SIZE = 50
+
+# Rate-limited or 5xx calls are retried with exponential backoff
+MAX_RETRIES = 5
+RETRY_BASE_SECONDS = 1.0
+
+# Event titles are the task title behind this prefix
+EVENT_TITLE_PREFIX = "[TaskMaster] "
+
+# Naive due dates are sent (and read back) as Asia/Kolkata (IST) wall time
+LOCAL_TIMEZONE = timezone(timedelta(hours=5, minutes=30))
+
+# Priority to color mapping (Google Calendar colorId)
+# 11 = Red (Tomato), 5 = Yellow (Banana), 9 = Blue (Blueberry)
+PRIORITY_COLORS = {
+    "high": "11",
+    "medium": "5",
+    "low": "9",
+}
 
-    try:
-        flow.fetch_token(code=code)
 
-        credentials = flow.credentials
-        return {
-            "access_token": credentials.token,
-            "refresh_token": credentials.refresh_token,
-            "token_expiry": credentials.expiry,
+def build_event_body(task) -> dict:
+    """Calendar event for a task's due date"""
+    due = task.due_date
+    priority = task.priority.value if hasattr(task.priority, "value") else task.priority
+
+    event_body = {
+        "summary": f"{EVENT_TITLE_PREFIX}{task.title}",
+        "description": (
+            f"Priority: {priority}\n"
+            f"Category: {task.category or 'None'}\n"
+            f"Status: {task.status.value if hasattr(task.status, 'value') else task.status}\n"
+            f"\n---\nSynced from TaskMaster"
+        ),
+        "colorId": PRIORITY_COLORS.get(priority, "9"),
+    }
+
+    # Check if due_date has time component
+    if isinstance(due, datetime):
+        # Google requires RFC3339. ISO format from naive datetime lacks offset.
+        # Assuming Asia/Kolkata (IST) which is +05:30
+        iso_due = due.isoformat()
+        if "+" not in iso_due and "Z" not in iso_due:
+            iso_due += "+05:30"
+
+        event_body["start"] = {
+            "dateTime": iso_due,
+            "timeZone": "Asia/Kolkata",
         }
-    except Exception:
-        raise
-
-
-def get_credentials(access_token: str, refresh_token: str, token_expiry: datetime | None = None) -> Credentials:
-    """Build Credentials object from stored tokens"""
-    return Credentials(
-        token=access_token,
-        refresh_token=refresh_token,
-        token_uri="https://oauth2.googleapis.com/token",
-        client_id=settings.GOOGLE_CLIENT_ID,
-        client_secret=settings.GOOGLE_CLIENT_SECRET,
-        expiry=token_expiry,
-    )
+
+        end_time = due + timedelta(hours=1)
+        iso_end = end_time.isoformat()
+        if "+" not in iso_end and "Z" not in iso_end:
+            iso_end += "+05:30"
+
+        event_body["end"] = {
+            "dateTime": iso_end,
+            "timeZone": "Asia/Kolkata",
+        }
+    else:
+        # All-day event
+        event_body["start"] = {"date": due.isoformat()}
+        event_body["end"] = {"date": (due + timedelta(days=1)).isoformat()}
+
+    return event_body
+
+
+@dataclass
+class CalendarTask:
+    """
+    Detached copy of the task fields calendar sync reads and writes
+
+    Sync works on these rather than on session-bound ORM objects, so the
+    session can be used for progress while calls are in flight. `dirty` marks copies whose sync
+    state (event id, fingerprint) must be written back.
+    """
+    id: uuid.UUID
+    title: str = ""
+    priority: str = ""
+    category: str | None = None
+    status: str = ""
+    due_date: datetime | None = None
+    updated_at: datetime | None = None
+    google_event_id: str | None = None
+    google_event_fingerprint: str | None = None
+    deleted: bool = False  # Task is gone; only its event remains to be removed
+    dirty: bool = False
+
+    @classmethod
+    def from_task(cls, task) -> "CalendarTask":
+        return cls(
+            id=task.id,
+            title=task.title,
+            priority=task.priority,
+            category=task.category,
+            status=task.status,
+            due_date=task.due_date,
+            updated_at=task.updated_at,
+            google_event_id=task.google_event_id,
+            google_event_fingerprint=task.google_event_fingerprint,
+        )
+
+
+def event_fingerprint(event_body: dict) -> str:
+    """Stable hash of an event body (title, priority, category, status, due date)"""
+    return hashlib.sha256(json.dumps(event_body, sort_keys=True).encode()).hexdigest()
+
+
+def event_task_fields(event: dict) -> tuple[str, datetime] | None:
+    """Title and due date an event implies for its task, or None if it has no usable start"""
+    summary = event.get("summary") or ""
+    title = summary.removeprefix(EVENT_TITLE_PREFIX).strip()[:200]
+    start = event.get("start") or {}
+    if start.get("dateTime"):
+        due = datetime.fromisoformat(start["dateTime"])
+        if due.tzinfo is not None:
+            due = due.astimezone(LOCAL_TIMEZONE).replace(tzinfo=None)
+    elif start.get("date"):
+        due = datetime.combine(date.fromisoformat(start["date"]), time())
+    else:
+        return None
+    return title, due
+
+
+def event_updated_at(event: dict) -> datetime | None:
+    """Event's last modification time as naive UTC"""
+    if not event.get("updated"):
+        return None
+    return datetime.fromisoformat(event["updated"]).astimezone(UTC).replace(tzinfo=None)
 
 
-def sync_tasks_to_calendar(tasks: list, credentials: Credentials) -> dict:
+def resolve_event_change(task: CalendarTask, event: dict) -> str:
+    """
+    Decide what a changed event means for its task
+    
+    Returns:
+        'ignored' (cancelled or undated event), 'unchanged' (same title and
+        due date, e.g. our own push), 'local' (the task was edited after
+        the event, so the task wins) or 'remote' (apply the event)
+    """
+    if event.get("status") == "cancelled":
+        return "ignored"
+    fields = event_task_fields(event)
+    if fields is None or not fields[0]:
+        return "ignored"
+    if fields == (task.title, task.due_date):
+        return "unchanged"
+    updated = event_updated_at(event)
+    if task.updated_at and updated and task.updated_at > updated:
+        return "local"
+    return "remote"
+
+
+def apply_event_changes(tasks_by_event_id: dict[str, CalendarTask], events: list[dict]) -> dict[str, list[CalendarTask]]:
+    """
+    Fold changed Calendar events into their tasks
+    
+    Tasks that take the event's title and due date also take its
+    fingerprint, so the edit isn't pushed straight back. Events without a
+    task (not created by us) are ignored.
+    
+    Returns:
+        Tasks grouped by resolve_event_change outcome
+    """
+    outcomes = {"remote": [], "local": [], "unchanged": [], "ignored": []}
+    for event in events:
+        task = tasks_by_event_id.get(event.get("id"))
+        if task is None:
+            continue
+        outcome = resolve_event_change(task, event)
+        if outcome == "remote":
+            task.title, task.due_date = event_task_fields(event)
+            task.google_event_fingerprint = event_fingerprint(build_event_body(task))
+            task.dirty = True
+        outcomes[outcome].append(task)
+    return outcomes
+
+
+def _event_call(task: CalendarTask, event_body: dict | None, operation: str) -> CalendarCall:
+    if operation == "insert":
+        return CalendarCall("POST", "calendars/primary/events", body=event_body)
+    if operation == "update":
+        return CalendarCall("PUT", f"calendars/primary/events/{task.google_event_id}", body=event_body)
+    return CalendarCall("DELETE", f"calendars/primary/events/{task.google_event_id}")
+
+
+async def sync_tasks_to_calendar(
+    tasks: list[CalendarTask],
+    get_token: Callable[[bool], Awaitable[str]],
+    on_progress: Callable[[dict], None] | None = None,
+) -> dict:
     """
     Sync tasks to Google Calendar as events.
     
-    Each task with a due_date becomes a calendar event.
-    Returns count of created/updated events.
+    Each task with a due_date becomes a calendar event. Tasks whose event
+    body fingerprint matches the last synced one are skipped without any
+    API call; deleted tasks and tasks that lost their due date have their
+    event removed.
+    
+    Inserts, updates and deletes go out in batches of BATCH_SIZE, one HTTP
+    round trip each over the shared connection pool. Updates of events
+    deleted on Google's side (404/410) fall back to an insert in the next
+    round; rate-limited and 5xx calls are retried with exponential backoff
+    (honoring Retry-After) up to MAX_RETRIES times.
+    
+    get_token(force_refresh) returns the user's access token. A 401, for
+    the whole batch or for items inside it (how an expired token usually
+    shows up in batch responses), refreshes the token once per sync and
+    resends only the rejected calls.
+    on_progress, if given, is called with the running counts after each
+    batch. Synced tasks get their new event id and fingerprint and are
+    marked dirty.
+    Returns count of created/updated/deleted/skipped events and errors.
     """
-    service = build("calendar", "v3", credentials=credentials)
-    created = 0
-    errors = 0
+    counts = {"processed": 0, "created": 0, "updated": 0, "deleted": 0, "skipped": 0, "errors": 0}
 
+    # (task, event body, fingerprint, operation) still to send
+    pending = []
     for task in tasks:
-        try:
-            # Use due_date as event date; if no time, make it an all-day event
-            due = task.due_date
-            if not due:
-                continue
+        if task.deleted or not task.due_date:
+            if task.google_event_id:
+                pending.append((task, None, None, "delete"))
+            continue
+        event_body = build_event_body(task)
+        fingerprint = event_fingerprint(event_body)
+        if task.google_event_id and fingerprint == task.google_event_fingerprint:
+            counts["skipped"] += 1
+            counts["processed"] += 1
+            continue
+        pending.append((task, event_body, fingerprint, "update" if task.google_event_id else "insert"))
 
-            # Priority to color mapping (Google Calendar colorId)
-            # 11 = Red (Tomato), 5 = Yellow (Banana), 9 = Blue (Blueberry)
-            priority_color = {
-                "high": "11",
-                "medium": "5",
-                "low": "9",
-            }
-
-            event_body = {
-                "summary": f"[TaskMaster] {task.title}",
-                "description": (
-                    f"Priority: {task.priority.value if hasattr(task.priority, 'value') else task.priority}\n"
-                    f"Category: {task.category or 'None'}\n"
-                    f"Status: {task.status.value if hasattr(task.status, 'value') else task.status}\n"
-                    f"\n---\nSynced from TaskMaster"
-                ),
-                "colorId": priority_color.get(
-                    task.priority.value if hasattr(task.priority, "value") else task.priority,
-                    "9"
-                ),
-            }
-
-
-            # Check if due_date has time component
-            if isinstance(due, datetime):
-                # Google requires RFC3339. ISO format from naive datetime lacks offset.
-                # Assuming Asia/Kolkata (IST) which is +05:30
-                iso_due = due.isoformat()
-                if "+" not in iso_due and "Z" not in iso_due:
-                    iso_due += "+05:30"
-                
-                event_body["start"] = {
-                    "dateTime": iso_due,
-                    "timeZone": "Asia/Kolkata",
-                }
-                
-                end_time = due + timedelta(hours=1)
-                iso_end = end_time.isoformat()
-                if "+" not in iso_end and "Z" not in iso_end:
-                    iso_end += "+05:30"
-                    
-                event_body["end"] = {
-                    "dateTime": iso_end,
-                    "timeZone": "Asia/Kolkata",
-                }
-            else:
-                # All-day event
-                event_body["start"] = {"date": due.isoformat()}
-                event_body["end"] = {"date": (due + timedelta(days=1)).isoformat()}
+    if not pending:
+        if on_progress:
+            on_progress(dict(counts))
+        return counts
 
-            if task.google_event_id:
+    token = await get_token(False)
+    refreshed = False
+    attempt = 0
+
+    while pending:
+        fallbacks = []
+        retries = []
+        resend = []  # Rejected with 401; resent right away with a refreshed token
+        wait = 0.0
+
+        for start in range(0, len(pending), BATCH_SIZE):
+            chunk = pending[start:start + BATCH_SIZE]
+            calls = [_event_call(task, event_body, operation) for task, event_body, _, operation in chunk]
 
+            sent_with = token
+            try:
                 try:
-                    service.events().update(
-                        calendarId="primary",
-                        eventId=task.google_event_id,
-                        body=event_body,
-                    ).execute()
-                    created += 1
-                except Exception:
-
-                    # If event not found, fallback to creating new one
-                    event = service.events().insert(
-                        calendarId="primary",
-                        body=event_body,
-                    ).execute()
-                    task.google_event_id = event["id"]
-                    created += 1
-            else:
+                    results = await google_api.batch(token, calls)
+                except GoogleAPIError as e:
+                    if e.status != 401 or refreshed:
+                        raise
+                    # Token revoked or expired early; refresh once and resend
+                    refreshed = True
+                    token = sent_with = await get_token(True)
+                    results = await google_api.batch(token, calls)
+            except GoogleAPIError as e:
+                # The batch call itself failed (e.g. rate limited); nothing in it was applied
+                if e.retryable:
+                    retries.extend(chunk)
+                    wait = max(wait, e.retry_after)
+                else:
+                    print(f"Error syncing batch of {len(chunk)} tasks: {e}")
+                    counts["errors"] += len(chunk)
+                    counts["processed"] += len(chunk)
+                if on_progress:
+                    on_progress(dict(counts))
+                continue
+            except Exception as e:
+                print(f"Error syncing batch of {len(chunk)} tasks: {e}")
+                counts["errors"] += len(chunk)
+                counts["processed"] += len(chunk)
+                if on_progress:
+                    on_progress(dict(counts))
+                continue
+
+            for item, result in zip(chunk, results):
+                task, event_body, fingerprint, operation = item
+                error = result.error
 
-                event = service.events().insert(
-                    calendarId="primary",
-                    body=event_body,
-                ).execute()
-                task.google_event_id = event["id"]
-                created += 1
+                if error is None or (operation == "delete" and error.status in (404, 410)):
+                    if operation == "insert":
+                        task.google_event_id = result.data["id"]
+                        counts["created"] += 1
+                    elif operation == "update":
+                        counts["updated"] += 1
+                    else:
+                        task.google_event_id = None
+                        counts["deleted"] += 1
+                    task.google_event_fingerprint = fingerprint
+                    task.dirty = True
+                elif error.status == 401 and (sent_with != token or not refreshed):
+                    # Expired mid-sync; refresh once (unless an earlier batch already did)
+                    if sent_with == token:
+                        refreshed = True
+                        token = await get_token(True)
+                    resend.append(item)
+                    continue
+                elif operation == "update" and error.status in (404, 410):
+                    # Event was deleted in Google Calendar; create it again
+                    fallbacks.append((task, event_body, fingerprint, "insert"))
+                    continue
+                elif error.retryable:
+                    retries.append(item)
+                    wait = max(wait, error.retry_after)
+                    continue
+                else:
+                    print(f"Error syncing task '{task.title or task.id}': {error}")
+                    counts["errors"] += 1
+                counts["processed"] += 1
+
+            if on_progress:
+                on_progress(dict(counts))
+
+        if retries:
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                print(f"Giving up on {len(retries)} rate-limited calendar calls")
+                counts["errors"] += len(retries)
+                counts["processed"] += len(retries)
+                retries = []
+            else:
+                await asyncio.sleep(max(wait, RETRY_BASE_SECONDS * 2 ** (attempt - 1)) + random.uniform(0, 0.5))
 
-        except Exception as e:
-            print(f"Error syncing task '{task.title}': {e}")
+        pending = resend + fallbacks + retries
 
-            errors += 1
+    if on_progress:
+        on_progress(dict(counts))
 
-    return {"created": created, "errors": errors}
+    return counts
@@ -0,0 +1,333 @@
+"""XP leaderboards backed by in-memory order-statistic indexes"""
+import asyncio
+import time
+import uuid
+from bisect import bisect_left, insort
+from datetime import date
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.query_stats import create_background_task
+from app.models.gamification import UserPeriodXP, UserStats
+from app.services.xp_ledger import rollup_start
+
+PERIODS = ("all_time", "weekly", "monthly")
+
+# UserPeriodXP.period value for each periodic leaderboard
+PERIOD_KINDS = {"weekly": "week", "monthly": "month"}
+
+# Target bucket size of the sorted index
+_BUCKET_SIZE = 1000
+
+# Rows fetched per round trip when (re)building a leaderboard
+_LOAD_BATCH_SIZE = 10000
+
+
+def period_start(period: str, day: date) -> date | None:
+    """First day of the leaderboard window containing `day` (None for all-time)"""
+    if period in PERIOD_KINDS:
+        return rollup_start(PERIOD_KINDS[period], day)
+    return None
+
+
+class RankIndex:
+    """
+    Sorted multiset of keys split into buckets of ~_BUCKET_SIZE
+
+    A Fenwick tree over bucket sizes gives the number of keys before any
+    bucket in O(log n), so inserts, removals, rank lookups and positional
+    slices cost a few bisects plus a memmove inside one small bucket. The
+    tree is rebuilt in O(n / _BUCKET_SIZE) only when a bucket splits or
+    empties.
+    """
+
+    def __init__(self):
+        self._buckets: list[list] = []
+        self._maxes: list = []
+        self._tree: list[int] = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    @classmethod
+    def from_sorted(cls, keys: list) -> "RankIndex":
+        """Build from keys already in ascending order, without per-key inserts"""
+        index = cls()
+        index._buckets = [keys[i:i + _BUCKET_SIZE] for i in range(0, len(keys), _BUCKET_SIZE)]
+        index._maxes = [bucket[-1] for bucket in index._buckets]
+        index._len = len(keys)
+        index._rebuild_tree()
+        return index
+
+    # --- Fenwick tree over bucket sizes ---
+
+    def _rebuild_tree(self) -> None:
+        tree = [len(bucket) for bucket in self._buckets]
+        for i in range(len(tree)):
+            parent = i | (i + 1)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, bucket_index: int, delta: int) -> None:
+        while bucket_index < len(self._tree):
+            self._tree[bucket_index] += delta
+            bucket_index |= bucket_index + 1
+
+    def _keys_before(self, bucket_index: int) -> int:
+        """Number of keys in buckets [0, bucket_index)"""
+        total = 0
+        while bucket_index > 0:
+            total += self._tree[bucket_index - 1]
+            bucket_index &= bucket_index - 1
+        return total
+
+    def _locate(self, position: int) -> tuple[int, int]:
+        """(bucket index, offset in it) of a sorted position < len(self)"""
+        bucket_index = 0
+        step = 1 << len(self._tree).bit_length()
+        while step:
+            candidate = bucket_index + step
+            if candidate <= len(self._tree) and self._tree[candidate - 1] <= position:
+                bucket_index = candidate
+                position -= self._tree[candidate - 1]
+            step >>= 1
+        return bucket_index, position
+
+    # --- Keys ---
+
+    def add(self, key) -> None:
+        """Insert a key"""
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._rebuild_tree()
+            return
+
+        index = min(bisect_left(self._maxes, key), len(self._buckets) - 1)
+        bucket = self._buckets[index]
+        insort(bucket, key)
+        self._maxes[index] = bucket[-1]
+
+        if len(bucket) > 2 * _BUCKET_SIZE:
+            self._buckets[index:index + 1] = [bucket[:_BUCKET_SIZE], bucket[_BUCKET_SIZE:]]
+            self._maxes[index:index + 1] = [bucket[_BUCKET_SIZE - 1], bucket[-1]]
+            self._rebuild_tree()
+        else:
+            self._tree_add(index, 1)
+
+    def remove(self, key) -> None:
+        """Remove one occurrence of a key that is known to be present"""
+        index = bisect_left(self._maxes, key)
+        bucket = self._buckets[index]
+        del bucket[bisect_left(bucket, key)]
+        self._len -= 1
+        if bucket:
+            self._maxes[index] = bucket[-1]
+            self._tree_add(index, -1)
+        else:
+            del self._buckets[index]
+            del self._maxes[index]
+            self._rebuild_tree()
+
+    def count_below(self, key) -> int:
+        """Number of keys strictly less than `key`"""
+        index = bisect_left(self._maxes, key)
+        if index == len(self._buckets):
+            return self._len
+        return self._keys_before(index) + bisect_left(self._buckets[index], key)
+
+    def slice(self, start: int, stop: int) -> list:
+        """Keys at sorted positions [start, stop)"""
+        start, stop = max(start, 0), min(stop, self._len)
+        if start >= stop:
+            return []
+        index, offset = self._locate(start)
+        keys = []
+        while len(keys) < stop - start:
+            keys.extend(self._buckets[index][offset:offset + stop - start - len(keys)])
+            index, offset = index + 1, 0
+        return keys
+
+
+class Leaderboard:
+    """
+    XP ranking for one window
+
+    Keys are (-xp, user_id) so ascending order is highest XP first. Ties
+    share a rank ("1224" ranking): rank = users with more XP + 1.
+    """
+
+    def __init__(self, period: str, start: date | None):
+        self.period = period
+        self.period_start = start
+        self.loaded_at = 0.0
+        self._index = RankIndex()
+        self._xp: dict[uuid.UUID, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @classmethod
+    def from_rows(cls, period: str, start: date | None, rows: list[tuple[uuid.UUID, int]]) -> "Leaderboard":
+        """Build from (user_id, xp) rows with a single sort"""
+        board = cls(period, start)
+        board._xp = dict(rows)
+        board._index = RankIndex.from_sorted(sorted((-xp, user_id) for user_id, xp in board._xp.items()))
+        return board
+
+    def set(self, user_id: uuid.UUID, xp: int) -> None:
+        """Insert or move a user"""
+        old_xp = self._xp.get(user_id)
+        if old_xp == xp:
+            return
+        if old_xp is not None:
+            self._index.remove((-old_xp, user_id))
+        self._xp[user_id] = xp
+        self._index.add((-xp, user_id))
+
+    def xp_of(self, user_id: uuid.UUID) -> int | None:
+        return self._xp.get(user_id)
+
+    def rank_of_xp(self, xp: int) -> int:
+        """Rank a user with this much XP would have"""
+        return self._index.count_below((-xp,)) + 1
+
+    def position_of(self, user_id: uuid.UUID) -> int | None:
+        """Zero-based sorted position of a user"""
+        xp = self._xp.get(user_id)
+        if xp is None:
+            return None
+        return self._index.count_below((-xp, user_id))
+
+    def entries(self, start: int, stop: int) -> list[tuple[int, uuid.UUID, int]]:
+        """
+        (rank, user_id, xp) for sorted positions [start, stop)
+
+        Only the first row's rank is looked up; after it, a row with less
+        XP than the one before ranks at its own position + 1.
+        """
+        start = max(start, 0)
+        entries = []
+        rank = previous_xp = None
+        for position, (neg_xp, user_id) in enumerate(self._index.slice(start, stop), start):
+            xp = -neg_xp
+            if rank is None:
+                rank = self.rank_of_xp(xp)
+            elif xp != previous_xp:
+                rank = position + 1
+            entries.append((rank, user_id, xp))
+            previous_xp = xp
+        return entries
+
+
+class LeaderboardRegistry:
+    """
+    Process-wide leaderboards, kept in sync incrementally by award_xp
+
+    Each worker process holds its own copy, so boards are rebuilt from the
+    database every LEADERBOARD_REFRESH_SECONDS to pick up awards made by
+    other workers. A stale board keeps being served while its replacement
+    is built in the background: rows are streamed from the database, the
+    index is sorted in a worker thread, and awards recorded meanwhile are
+    replayed onto it before it is swapped in. Periodic boards roll over to
+    a fresh window when the week or month changes; only then (or on first
+    use) do callers wait for the build.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._boards: dict[str, Leaderboard] = {}
+        # In-flight builds and the awards recorded since each one started,
+        # keyed by (period, window start)
+        self._builds: dict[tuple[str, date | None], asyncio.Task] = {}
+        self._deltas: dict[tuple[str, date | None], dict[uuid.UUID, int]] = {}
+
+    async def get(self, period: str) -> Leaderboard:
+        """Get a leaderboard, building it when missing or rolled over and refreshing it when stale"""
+        start = period_start(period, date.today())
+        board = self._boards.get(period)
+        if board is not None and board.period_start == start:
+            if time.monotonic() - board.loaded_at >= self.refresh_seconds:
+                self._build((period, start))
+            return board
+
+        # Nothing to serve for this window yet; several callers share one build
+        return await asyncio.shield(self._build((period, start)))
+
+    def _build(self, key: tuple[str, date | None]) -> asyncio.Task:
+        task = self._builds.get(key)
+        if task is None:
+            self._deltas[key] = {}
+            task = self._builds[key] = create_background_task(self._rebuild(key))
+            # Background refreshes are never awaited; their errors are logged in _rebuild
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _rebuild(self, key: tuple[str, date | None]) -> Leaderboard:
+        period, start = key
+        try:
+            rows = await self._load(period, start)
+            board = await asyncio.to_thread(Leaderboard.from_rows, period, start, rows)
+
+            # No await from here to the swap, so no award can slip between them
+            for user_id, xp in self._deltas[key].items():
+                board.set(user_id, xp)
+            board.loaded_at = time.monotonic()
+            if start == period_start(period, date.today()):
+                self._boards[period] = board
+            return board
+        except Exception as e:
+            print(f"Error rebuilding {period} leaderboard: {e}")
+            raise
+        finally:
+            del self._builds[key]
+            del self._deltas[key]
+
+    async def _load(self, period: str, start: date | None) -> list[tuple[uuid.UUID, int]]:
+        if period == "all_time":
+            query = select(UserStats.user_id, UserStats.total_xp).order_by(UserStats.total_xp.desc())
+        else:
+            query = (
+                select(UserPeriodXP.user_id, UserPeriodXP.xp)
+                .where(UserPeriodXP.period == PERIOD_KINDS[period], UserPeriodXP.period_start == start)
+                .order_by(UserPeriodXP.xp.desc())
+            )
+
+        rows = []
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query.execution_options(yield_per=_LOAD_BATCH_SIZE))
+            async for partition in result.partitions():
+                rows.extend(partition)
+        return rows
+
+    def record(self, user_id: uuid.UUID, total_xp: int, period_xp: dict[str, tuple[date, int]]) -> None:
+        """
+        Apply a committed award to the loaded boards and to boards being built
+
+        Args:
+            user_id: User's ID
+            total_xp: User's new all-time XP
+            period_xp: New rollup totals from record_xp, keyed by rollup period
+        """
+        self._apply("all_time", None, user_id, total_xp)
+
+        for period, kind in PERIOD_KINDS.items():
+            if kind in period_xp:
+                start, xp = period_xp[kind]
+                self._apply(period, start, user_id, xp)
+
+    def _apply(self, period: str, start: date | None, user_id: uuid.UUID, xp: int) -> None:
+        board = self._boards.get(period)
+        if board is not None and board.period_start == start:
+            board.set(user_id, xp)
+        deltas = self._deltas.get((period, start))
+        if deltas is not None:
+            deltas[user_id] = xp
+
+
+leaderboards = LeaderboardRegistry(refresh_seconds=settings.LEADERBOARD_REFRESH_SECONDS)
@@ -0,0 +1,97 @@
+"""Password hashing pool that keeps Argon2 off the event loop"""
+import asyncio
+import contextlib
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from app.core.config import settings
+from app.core.security import hash_password, verify_and_update_password
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full; mapped to 503 by the app"""
+
+
+class PasswordHashingPool:
+    """
+    Bounded thread pool for Argon2 work
+
+    argon2-cffi releases the GIL while hashing, so threads give real
+    parallelism. Work beyond `max_pending` queued calls is rejected
+    instead of piling up behind a login burst.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="argon2")
+        self._pending = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._max_pending_seen = 0
+        self._total_seconds = 0.0
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        future = self._executor.submit(fn, *args)
+        self._pending += 1
+        self._submitted += 1
+        self._max_pending_seen = max(self._max_pending_seen, self._pending)
+        # A cancelled caller doesn't stop a hash already running, so the slot
+        # is freed when the thread is done with it, not when the caller leaves
+        future.add_done_callback(lambda _: self._call_soon(loop, self._finished, start))
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable[..., None], *args) -> None:
+        # Done callbacks run on the worker thread; the loop may already be closed at shutdown
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(callback, *args)
+
+    def _finished(self, start: float) -> None:
+        self._pending -= 1
+        self._total_seconds += time.perf_counter() - start
+
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop"""
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """
+        Verify a password without blocking the event loop
+
+        Returns:
+            Tuple of (is_valid, new_hash); new_hash is set when the stored
+            hash uses outdated Argon2 parameters
+        """
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+    def metrics(self) -> dict:
+        """Snapshot of queue depth and throughput counters"""
+        completed = self._submitted - self._pending
+        return {
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "max_pending_seen": self._max_pending_seen,
+            "submitted": self._submitted,
+            "rejected": self._rejected,
+            "avg_ms": round(self._total_seconds * 1000 / completed, 2) if completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
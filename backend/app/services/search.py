@@ -0,0 +1,110 @@
+import re
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import TSQUERY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.task import Task
+
+# Text search configuration used by Task.search_vector
+SEARCH_CONFIG = "english"
+
+# Prefix terms are also matched unstemmed, so stopwords ("the", "on") still
+# match as prefixes ("theme", "onboarding") instead of emptying the query
+PREFIX_CONFIG = "simple"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_prefix_tsquery(text: str) -> ColumnElement | None:
+    """
+    Turn free-form user input into a prefix-matching tsquery
+
+    Every word must match, and each word is matched as a prefix so
+    results update while the user is still typing. A word matches either
+    stemmed (SEARCH_CONFIG) or as typed (PREFIX_CONFIG); the latter keeps
+    stopword-only input from becoming an empty query that matches nothing.
+
+    Args:
+        text: Raw search input
+
+    Returns:
+        tsquery expression, or None if the input has no searchable words
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return None
+
+    query = None
+    for token in tokens:
+        term = f"{token}:*"
+        word = func.to_tsquery(SEARCH_CONFIG, term, type_=TSQUERY).op("||", return_type=TSQUERY)(
+            func.to_tsquery(PREFIX_CONFIG, term, type_=TSQUERY)
+        )
+        query = word if query is None else query.op("&&", return_type=TSQUERY)(word)
+    return query
+
+
+def fulltext_condition(text: str) -> ColumnElement[bool] | None:
+    """
+    Build a WHERE condition matching tasks against the search vector
+
+    Args:
+        text: Raw search input
+
+    Returns:
+        SQL condition served by the GIN index, or None for empty input
+    """
+    tsquery = build_prefix_tsquery(text)
+    if tsquery is None:
+        return None
+    return Task.search_vector.op("@@")(tsquery)
+
+
+async def search_tasks(
+    user_id: str,
+    text: str,
+    limit: int,
+    db: AsyncSession
+) -> list[Task]:
+    """
+    Ranked full-text search over a user's tasks
+
+    Falls back to trigram similarity on the title when full-text search
+    finds nothing, so misspelled queries still return close matches.
+
+    Args:
+        user_id: User's ID
+        text: Raw search input
+        limit: Maximum number of results
+        db: Database session
+
+    Returns:
+        Matching tasks, best match first
+    """
+    tsquery = build_prefix_tsquery(text)
+    if tsquery is None:
+        return []
+
+    rank = func.ts_rank(Task.search_vector, tsquery)
+    result = await db.execute(
+        select(Task)
+        .where(Task.user_id == user_id, Task.search_vector.op("@@")(tsquery))
+        .order_by(rank.desc(), Task.created_at.desc())
+        .limit(limit)
+    )
+    tasks = result.scalars().all()
+    if tasks:
+        return list(tasks)
+
+    # Typo-tolerant fallback: the pg_trgm `%` operator (similarity above
+    # pg_trgm.similarity_threshold) is served by the trigram index on title
+    similarity = func.similarity(Task.title, text)
+    result = await db.execute(
+        select(Task)
+        .where(Task.user_id == user_id, Task.title.op("%")(text))
+        .order_by(similarity.desc(), Task.created_at.desc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
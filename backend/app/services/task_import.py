@@ -0,0 +1,263 @@
+import codecs
+import csv
+import json
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.validation import format_validation_error
+from app.models.task import StatusEnum
+from app.schemas.task import TaskCreate
+from app.services.task_export import TAGS_SEPARATOR
+
+# Rows validated and sent per COPY
+IMPORT_BATCH_SIZE = 5000
+
+# Longest accepted line (in bytes) or CSV record; guards against an unterminated quote
+# or a body without newlines swallowing the rest of the stream into memory
+MAX_RECORD_LENGTH = 1_000_000
+RECORD_TOO_LONG = f"Record too long (limit {MAX_RECORD_LENGTH})"
+
+# The csv module rejects fields over 128 KiB by default; any field that fits
+# in an accepted record is allowed
+csv.field_size_limit(max(csv.field_size_limit(), MAX_RECORD_LENGTH))
+
+# Per-row errors returned to the client; further errors are only counted
+MAX_REPORTED_ERRORS = 100
+
+COPY_COLUMNS = [
+    "id",
+    "user_id",
+    "title",
+    "description",
+    "priority",
+    "status",
+    "category",
+    "tags",
+    "due_date",
+    "created_at",
+    "updated_at",
+]
+
+
+@dataclass
+class InvalidLine:
+    """A line that could not be read, reported as that row's error"""
+    error: str
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str | InvalidLine]:
+    """
+    Split a byte stream into decoded lines (newline included) incrementally
+
+    The unfinished line is kept as a list of byte pieces, joined once when
+    its newline arrives. Each line is decoded on its own, so invalid UTF-8
+    only fails that line. A line longer than MAX_RECORD_LENGTH bytes is
+    dropped as it grows, so a body without newlines can't buffer without
+    bound.
+    """
+    pending: list[bytes] = []
+    pending_length = 0
+    overlong = False
+    first = True
+
+    def decode(line: bytes) -> str | InvalidLine:
+        nonlocal first
+        if first:
+            first = False
+            line = line.removeprefix(codecs.BOM_UTF8)
+        try:
+            return line.decode("utf-8")
+        except UnicodeDecodeError as e:
+            return InvalidLine(f"Invalid UTF-8 at byte {e.start}")
+
+    async for chunk in chunks:
+        *lines, rest = chunk.split(b"\n")
+        for line in lines:
+            if overlong or pending_length + len(line) > MAX_RECORD_LENGTH:
+                yield InvalidLine(RECORD_TOO_LONG)
+            else:
+                yield decode(b"".join(pending) + line + b"\n")
+            pending, pending_length, overlong = [], 0, False
+        if not overlong:
+            pending.append(rest)
+            pending_length += len(rest)
+            if pending_length > MAX_RECORD_LENGTH:
+                pending, pending_length, overlong = [], 0, True
+
+    if overlong:
+        yield InvalidLine(RECORD_TOO_LONG)
+    elif pending_length:
+        yield decode(b"".join(pending))
+
+
+async def _csv_records(lines: AsyncIterator[str | InvalidLine]) -> AsyncIterator[dict | str]:
+    """
+    Parse CSV lines into dicts keyed by the header row
+
+    A quoted field may span lines; a record is complete once its quote
+    count is even.
+    """
+    header = None
+    parts: list[str] = []
+    length = 0
+    quotes = 0
+    async for line in lines:
+        if isinstance(line, InvalidLine):
+            yield line.error
+            parts, length, quotes = [], 0, 0
+            continue
+        parts.append(line)
+        length += len(line)
+        quotes += line.count('"')
+        if length > MAX_RECORD_LENGTH:
+            yield f"{RECORD_TOO_LONG} (unterminated quoted field?)"
+            parts, length, quotes = [], 0, 0
+            continue
+        if quotes % 2:
+            continue
+        record = "".join(parts)
+        parts, length, quotes = [], 0, 0
+        if record.strip():
+            try:
+                values = next(csv.reader([record]))
+            except csv.Error as e:
+                yield f"Invalid CSV: {e}"
+                continue
+            if header is None:
+                header = [name.strip() for name in values]
+            elif len(values) != len(header):
+                yield f"Expected {len(header)} columns, got {len(values)}"
+            else:
+                yield {
+                    name: value
+                    for name, value in zip(header, values, strict=True)
+                    if value != ""
+                }
+    if "".join(parts).strip():
+        yield "Unterminated quoted field"
+
+
+async def _ndjson_records(lines: AsyncIterator[str | InvalidLine]) -> AsyncIterator[dict | str]:
+    """Parse NDJSON lines into dicts"""
+    async for line in lines:
+        if isinstance(line, InvalidLine):
+            yield line.error
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield f"Invalid JSON: {e.msg}"
+            continue
+        yield record if isinstance(record, dict) else "Expected a JSON object"
+
+
+def _has_nul(task_data: TaskCreate) -> bool:
+    """Postgres text can't hold NUL, and one such row would fail its whole COPY batch"""
+    texts = [task_data.title, task_data.description or "", task_data.category or "", *(task_data.tags or [])]
+    return any("\x00" in text for text in texts)
+
+
+def _to_copy_row(user_id: uuid.UUID, task_data: TaskCreate, now: datetime) -> tuple:
+    """Convert a validated task into a COPY record matching COPY_COLUMNS"""
+    due_date = task_data.due_date
+    if due_date is not None and due_date.tzinfo is not None:
+        due_date = due_date.astimezone(UTC).replace(tzinfo=None)
+    return (
+        uuid.uuid4(),
+        user_id,
+        task_data.title,
+        task_data.description,
+        # Enum columns store member names
+        task_data.priority.name,
+        StatusEnum.PENDING.name,
+        task_data.category,
+        task_data.tags or [],
+        due_date,
+        now,
+        now,
+    )
+
+
+async def _copy_batch(rows: list[tuple], db: AsyncSession) -> None:
+    """Load one batch into tasks with asyncpg COPY and commit it"""
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        "tasks",
+        records=rows,
+        columns=COPY_COLUMNS,
+    )
+    await db.commit()
+
+
+async def import_tasks(
+    user_id: uuid.UUID,
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    db: AsyncSession
+) -> dict:
+    """
+    Import tasks from a streamed CSV or NDJSON body
+
+    Each row is validated against TaskCreate; valid rows are loaded in
+    batches with COPY and committed per batch, invalid rows are reported
+    and skipped. Memory is bounded by the batch size.
+
+    Args:
+        user_id: Owner of the imported tasks
+        chunks: Raw request body chunks
+        fmt: "csv" or "ndjson"
+        db: Database session
+
+    Returns:
+        Dictionary with imported/failed counts and per-row errors
+    """
+    parse = _csv_records if fmt == "csv" else _ndjson_records
+    imported = 0
+    failed = 0
+    errors: list[dict] = []
+    batch: list[tuple] = []
+    now = datetime.utcnow()
+
+    row_number = 0
+    async for record in parse(_lines(chunks)):
+        row_number += 1
+
+        error = None
+        if isinstance(record, str):
+            error = record
+        else:
+            if fmt == "csv" and "tags" in record:
+                record["tags"] = [tag for tag in record["tags"].split(TAGS_SEPARATOR) if tag]
+            try:
+                task_data = TaskCreate.model_validate(record)
+            except ValidationError as e:
+                error = format_validation_error(e)
+            else:
+                if _has_nul(task_data):
+                    error = "Text fields must not contain NUL characters"
+                else:
+                    batch.append(_to_copy_row(user_id, task_data, now))
+
+        if error:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "error": error})
+
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await _copy_batch(batch, db)
+            imported += len(batch)
+            batch = []
+
+    if batch:
+        await _copy_batch(batch, db)
+        imported += len(batch)
+
+    return {"imported": imported, "failed": failed, "errors": errors}
@@ -0,0 +1,219 @@
+"""Append-only XP ledger with incrementally maintained period rollups"""
+import asyncio
+import contextlib
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.database import engine
+from app.models.gamification import UserPeriodXP, XPEvent
+
+# Rollup granularities kept in user_period_xp
+ROLLUP_PERIODS = ("day", "week", "month")
+
+# Monthly xp_events partitions created ahead of the current month
+PARTITION_MONTHS_AHEAD = 3
+
+# How often running processes look for partitions to create
+PARTITION_CHECK_SECONDS = 6 * 60 * 60
+
+
+def rollup_start(period: str, day: date) -> date:
+    """First day of the rollup period containing `day` (weeks start on Monday)"""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_period_start(period: str, start: date) -> date:
+    """First day of the rollup period after the one starting at `start`"""
+    if period == "week":
+        return start + timedelta(days=7)
+    if period == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+async def record_xp(
+    user_id: str,
+    events: list[dict],
+    day: date,
+    db: AsyncSession
+) -> dict[str, tuple[date, int]]:
+    """
+    Append XP events and add them to the user's rollups
+
+    Runs in the caller's transaction, so the ledger, the rollups and the
+    UserStats counters commit (or roll back) together.
+
+    Args:
+        user_id: User's ID
+        events: Events as dicts with xp, source and optional achievement_id
+        day: Day the XP was earned
+        db: Database session
+
+    Returns:
+        New XP total per rollup period, keyed by period, with the period start
+    """
+    now = datetime.utcnow()
+    await db.execute(
+        pg_insert(XPEvent).values([
+            {
+                "user_id": user_id,
+                "created_at": now,
+                "xp": event["xp"],
+                "source": event["source"],
+                "achievement_id": event.get("achievement_id"),
+            }
+            for event in events
+        ])
+    )
+
+    earned = sum(event["xp"] for event in events)
+    insert_stmt = pg_insert(UserPeriodXP).values([
+        {"user_id": user_id, "period": period, "period_start": rollup_start(period, day), "xp": earned}
+        for period in ROLLUP_PERIODS
+    ])
+    result = await db.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=[UserPeriodXP.user_id, UserPeriodXP.period, UserPeriodXP.period_start],
+            set_={"xp": UserPeriodXP.xp + insert_stmt.excluded.xp},
+        ).returning(UserPeriodXP.period, UserPeriodXP.period_start, UserPeriodXP.xp)
+    )
+    return {row.period: (row.period_start, row.xp) for row in result}
+
+
+async def get_xp_history(
+    user_id: str,
+    period: str,
+    start: date,
+    end: date,
+    db: AsyncSession
+) -> list[tuple[date, int]]:
+    """
+    XP earned per period between two dates, read from the rollups
+
+    Args:
+        user_id: User's ID
+        period: 'day', 'week' or 'month'
+        start: First day of the range (snapped to its period start)
+        end: Last day of the range
+        db: Database session
+
+    Returns:
+        (period_start, xp) for every period in the range, zero-filled
+    """
+    first = rollup_start(period, start)
+    result = await db.execute(
+        select(UserPeriodXP.period_start, UserPeriodXP.xp).where(
+            UserPeriodXP.user_id == user_id,
+            UserPeriodXP.period == period,
+            UserPeriodXP.period_start.between(first, end),
+        )
+    )
+    earned = dict(result.all())
+
+    series = []
+    current = first
+    while current <= end:
+        series.append((current, earned.get(current, 0)))
+        current = next_period_start(period, current)
+    return series
+
+
+async def ensure_xp_event_partitions(conn: AsyncConnection, today: date | None = None) -> int:
+    """
+    Create monthly xp_events partitions for this month and the next few
+
+    Partitions must exist before rows for their month arrive; otherwise
+    those rows land in the default partition. Months that already have
+    rows in the default partition get a partition too. Each new partition
+    is created detached, filled with its month's rows moved out of the
+    default partition, then attached, since Postgres refuses to add a
+    partition whose range still has rows in the default one.
+
+    Args:
+        conn: Database connection (inside a transaction)
+        today: Reference day, defaults to today
+
+    Returns:
+        Number of partitions created
+    """
+    if conn.dialect.name != "postgresql":
+        return 0
+
+    # Workers starting or checking at the same time take turns
+    await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('xp_events_partitions'))"))
+
+    start = rollup_start("month", today or date.today())
+    months = set()
+    for _ in range(PARTITION_MONTHS_AHEAD + 1):
+        months.add(start)
+        start = next_period_start("month", start)
+    result = await conn.execute(text("SELECT DISTINCT date_trunc('month', created_at) FROM xp_events_default"))
+    months.update(month.date() for month in result.scalars())
+
+    created = 0
+    for start in sorted(months):
+        name = f"xp_events_{start:%Y_%m}"
+        if await conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}):
+            continue
+        end = next_period_start("month", start)
+        await conn.execute(text(f"CREATE TABLE {name} (LIKE xp_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        await conn.execute(text(
+            f"WITH moved AS ("
+            f"DELETE FROM xp_events_default "
+            f"WHERE created_at >= '{start.isoformat()}' AND created_at < '{end.isoformat()}' RETURNING *"
+            f") INSERT INTO {name} SELECT * FROM moved"
+        ))
+        await conn.execute(text(
+            f"ALTER TABLE xp_events ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        created += 1
+    return created
+
+
+class XPPartitionMaintainer:
+    """
+    Keeps monthly xp_events partitions ahead of the clock
+
+    Startup creates the partitions once; this re-checks every
+    PARTITION_CHECK_SECONDS so processes that run for months keep writing
+    into real partitions rather than the default one.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start the periodic check"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic check"""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with engine.begin() as conn:
+                    created = await ensure_xp_event_partitions(conn)
+                if created:
+                    print(f"Created {created} xp_events partition(s)")
+            except Exception as e:
+                print(f"Error creating xp_events partitions: {e}")
+
+
+xp_partition_maintainer = XPPartitionMaintainer(interval=PARTITION_CHECK_SECONDS)
@@ -0,0 +1,133 @@
+"""
+Benchmark task search: legacy ILIKE scan vs. full-text (GIN) vs. trigram.
+
+Seeds a throwaway user with synthetic tasks, times each search path and
+removes the user (and its tasks) afterwards.
+
+Usage:
+    python bench_search.py [--rows 1000000] [--runs 20]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, or_, select, text
+
+from app.core.database import AsyncSessionLocal, Base, engine
+from app.models.task import Task
+from app.models.user import User
+from app.services.search import fulltext_condition, search_tasks
+
+WORDS = [
+    "report", "meeting", "invoice", "design", "review", "deploy", "budget",
+    "client", "email", "refactor", "presentation", "groceries", "workout",
+    "dentist", "roadmap", "hiring", "security", "migration", "release", "backup",
+]
+
+SEED_SQL = text(
+    """
+    INSERT INTO tasks (id, user_id, title, description, priority, status,
+                       category, tags, created_at, updated_at)
+    SELECT
+        gen_random_uuid(),
+        CAST(:user_id AS uuid),
+        w[1 + (g * 7) % 20] || ' ' || w[1 + (g * 13) % 20] || ' ' || g,
+        repeat(w[1 + (g * 3) % 20] || ' ' || w[1 + (g * 11) % 20] || ' ', 6),
+        (ARRAY['LOW', 'MEDIUM', 'HIGH'])[1 + g % 3]::priorityenum,
+        (ARRAY['PENDING', 'COMPLETED'])[1 + g % 2]::statusenum,
+        (ARRAY['work', 'personal', 'health', 'finance'])[1 + g % 4],
+        ARRAY[w[1 + (g * 5) % 20]],
+        now() - make_interval(secs => g),
+        now() - make_interval(secs => g)
+    FROM generate_series(1, CAST(:rows AS integer)) AS g,
+         (SELECT CAST(:words AS text[]) AS w) AS words
+    """
+)
+
+QUERIES = ["invoice", "deploy rev", "presentaton"]
+
+
+async def timed(label: str, runs: int, fn) -> None:
+    """Run an async callable repeatedly and print latency percentiles"""
+    samples = []
+    rows = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        rows = await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    print(f"  {label:<12} median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms   rows {rows}")
+
+
+async def main(rows: int, runs: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    user_id = uuid.uuid4()
+    async with AsyncSessionLocal() as db:
+        db.add(User(
+            id=user_id,
+            username=f"bench_{user_id.hex[:8]}",
+            email=f"bench_{user_id.hex[:8]}@example.com",
+            hashed_password="!",
+        ))
+        await db.commit()
+
+        print(f"Seeding {rows} tasks...")
+        start = time.perf_counter()
+        await db.execute(SEED_SQL, {"user_id": user_id, "rows": rows, "words": WORDS})
+        await db.commit()
+        await db.execute(text("ANALYZE tasks"))
+        print(f"Seeded in {time.perf_counter() - start:.1f} s\n")
+
+        try:
+            for q in QUERIES:
+                print(f"Query {q!r}")
+
+                async def ilike(q=q):
+                    pattern = f"%{q}%"
+                    result = await db.execute(
+                        select(Task.id)
+                        .where(
+                            Task.user_id == user_id,
+                            or_(Task.title.ilike(pattern), Task.description.ilike(pattern)),
+                        )
+                        .order_by(Task.created_at.desc(), Task.id.desc())
+                        .limit(100)
+                    )
+                    return len(result.all())
+
+                async def fulltext(q=q):
+                    result = await db.execute(
+                        select(Task.id)
+                        .where(Task.user_id == user_id, fulltext_condition(q))
+                        .order_by(Task.created_at.desc(), Task.id.desc())
+                        .limit(100)
+                    )
+                    return len(result.all())
+
+                async def ranked(q=q):
+                    return len(await search_tasks(str(user_id), q, 20, db))
+
+                await timed("ilike", runs, ilike)
+                await timed("fulltext", runs, fulltext)
+                await timed("ranked", runs, ranked)
+                print()
+        finally:
+            await db.rollback()
+            await db.execute(delete(Task).where(Task.user_id == user_id))
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.runs))
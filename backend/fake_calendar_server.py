@@ -0,0 +1,399 @@
+"""
+Local fake of the Google Calendar events API for sync tests.
+
+Implements the OAuth token endpoint, events insert/update/patch/delete, the
+multipart batch endpoint, events list with syncToken paging, and push
+channels (events watch / channels stop). Keeps events in memory and can
+inject latency and rate limiting. Point the app at it with
+GOOGLE_CALENDAR_API_ENDPOINT=http://127.0.0.1:8765/calendar/v3/ and
+GOOGLE_TOKEN_URI=http://127.0.0.1:8765/token
+
+For push notifications also set
+GOOGLE_CALENDAR_WEBHOOK_URL=http://127.0.0.1:8000/api/calendar/webhook and call
+POST /api/calendar/watch. Then edit an event as a user would in Google:
+    curl -X PATCH -d '{"summary": "[TaskMaster] Renamed"}' \
+        http://127.0.0.1:8765/calendar/v3/calendars/primary/events/<event id>
+
+Usage:
+    python fake_calendar_server.py [--port 8765]                  # server only
+    python fake_calendar_server.py --bench 500 --latency 100      # server + timed sync of 500 tasks
+    python fake_calendar_server.py --bench 500 --rate-limit-every 40
+    python fake_calendar_server.py --bench 200 --users 20 --latency 100   # 20 users syncing at once
+"""
+import argparse
+import asyncio
+import email
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+from urllib.request import Request, urlopen
+
+EVENT_PATH = re.compile(r"^/calendar/v3/calendars/([^/]+)/events(?:/([^/]+))?$")
+CHANNEL_STOP_PATH = "/calendar/v3/channels/stop"
+
+# Deleted events stay as status=cancelled so incremental lists can report them
+events: dict[str, dict] = {}
+channels: dict[str, dict] = {}
+stats = {"http_requests": 0, "calls": 0, "rate_limited": 0, "connections": 0, "notifications": 0}
+lock = threading.Lock()
+options = SimpleNamespace(latency=0.0, rate_limit_every=0)
+change_seq = 0
+
+
+def _error(status: int, message: str, reason: str = "") -> tuple[int, dict]:
+    error = {"code": status, "message": message}
+    if reason:
+        error["errors"] = [{"reason": reason}]
+    return status, {"error": error}
+
+
+def _touch(event: dict) -> dict:
+    """Stamp an event as changed; its _seq orders incremental lists"""
+    global change_seq
+    change_seq += 1
+    event["_seq"] = change_seq
+    event["updated"] = datetime.now(UTC).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    return event
+
+
+def _public(event: dict) -> dict:
+    return {key: value for key, value in event.items() if key != "_seq"}
+
+
+def list_events(query: str) -> tuple[int, dict]:
+    """
+    Events list: a full listing without syncToken, only changes (including
+    cancelled events) after it. The last page carries nextSyncToken.
+    """
+    params = parse_qs(query)
+    max_results = int(params.get("maxResults", ["250"])[0])
+    if "pageToken" in params:
+        offset, since, snapshot = (int(part) for part in params["pageToken"][0].split("_"))
+    else:
+        offset, since, snapshot = 0, -1, change_seq
+        if "syncToken" in params:
+            try:
+                since = int(params["syncToken"][0].removeprefix("st-"))
+            except ValueError:
+                since = snapshot + 1
+            if since > snapshot:
+                return _error(410, "Sync token is no longer valid, a full sync is required.", "fullSyncRequired")
+
+    if since < 0:
+        matched = [e for e in events.values() if e.get("status") != "cancelled" and e["_seq"] <= snapshot]
+    else:
+        matched = [e for e in events.values() if since < e["_seq"] <= snapshot]
+    matched.sort(key=lambda event: event["_seq"])
+
+    page = {"kind": "calendar#events", "items": [_public(e) for e in matched[offset:offset + max_results]]}
+    if offset + max_results < len(matched):
+        page["nextPageToken"] = f"{offset + max_results}_{since}_{snapshot}"
+    else:
+        page["nextSyncToken"] = f"st-{snapshot}"
+    return 200, page
+
+
+def handle_call(method: str, path: str, body: str) -> tuple[int, dict]:
+    """Apply one Calendar API call and return (status, JSON body)"""
+    with lock:
+        stats["calls"] += 1
+        if options.rate_limit_every and stats["calls"] % options.rate_limit_every == 0:
+            stats["rate_limited"] += 1
+            return _error(429, "Rate Limit Exceeded", "rateLimitExceeded")
+
+        url = urlsplit(path)
+        payload = json.loads(body or "{}") if method in ("POST", "PUT", "PATCH") else {}
+
+        if method == "POST" and url.path == CHANNEL_STOP_PATH:
+            channels.pop(payload.get("id"), None)
+            return 204, {}
+
+        match = EVENT_PATH.match(url.path)
+        if not match:
+            return _error(404, "Not Found")
+        event_id = match.group(2)
+        existing = events.get(event_id) if event_id else None
+        if existing is not None and existing.get("status") == "cancelled":
+            existing = None
+
+        if method == "GET" and event_id is None:
+            return list_events(url.query)
+        if method == "POST" and event_id == "watch":
+            channel = {
+                **payload,
+                "resourceId": f"resource-{match.group(1)}",
+                "expiration": str(int((datetime.now(UTC) + timedelta(days=7)).timestamp() * 1000)),
+            }
+            channels[channel["id"]] = channel
+            threading.Thread(target=notify, args=(channel, "sync"), daemon=True).start()
+            return 200, {"kind": "api#channel", **{k: v for k, v in channel.items() if k != "token"}}
+        if method == "POST" and event_id is None:
+            event = _touch({**payload, "id": uuid.uuid4().hex, "status": "confirmed"})
+            events[event["id"]] = event
+            return 200, _public(event)
+        if method == "GET":
+            return (200, _public(existing)) if existing else _error(404, "Not Found")
+        if method == "PUT":
+            if existing is None:
+                return _error(404, "Not Found")
+            events[event_id] = _touch({**payload, "id": event_id, "status": "confirmed"})
+            return 200, _public(events[event_id])
+        if method == "PATCH":
+            if existing is None:
+                return _error(404, "Not Found")
+            existing.update({key: value for key, value in payload.items() if key != "id"})
+            return 200, _public(_touch(existing))
+        if method == "DELETE":
+            if existing is None:
+                return _error(410, "Resource has been deleted")
+            existing["status"] = "cancelled"
+            _touch(existing)
+            return 204, {}
+        return _error(405, "Method Not Allowed")
+
+
+def notify(channel: dict, state: str = "exists") -> None:
+    """POST a push notification to a channel's address, as Google does"""
+    with lock:
+        stats["notifications"] += 1
+        number = stats["notifications"]
+    request = Request(channel["address"], method="POST", data=b"", headers={
+        "X-Goog-Channel-ID": channel["id"],
+        "X-Goog-Channel-Token": channel.get("token", ""),
+        "X-Goog-Resource-ID": channel["resourceId"],
+        "X-Goog-Resource-State": state,
+        "X-Goog-Message-Number": str(number),
+    })
+    try:
+        urlopen(request, timeout=5).close()
+    except Exception as e:
+        print(f"Notification to {channel['address']} failed: {e}")
+
+
+def notify_all() -> None:
+    with lock:
+        targets = list(channels.values())
+    for channel in targets:
+        threading.Thread(target=notify, args=(channel,), daemon=True).start()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with lock:
+            stats["connections"] += 1
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        with lock:
+            stats["http_requests"] += 1
+        if options.latency:
+            time.sleep(options.latency)
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        if self.path == "/token":
+            self._handle_token(body)
+            return
+        if self.path.startswith("/batch/"):
+            self._handle_batch(body)
+            return
+
+        status, payload = handle_call(self.command, self.path, body)
+        self._send(status, json.dumps(payload).encode() if status != 204 else b"", "application/json")
+        if self.command != "GET" and status < 300 and "/events" in self.path and not self.path.endswith("/watch"):
+            notify_all()
+
+    def _handle_token(self, body: str) -> None:
+        form = parse_qs(body)
+        grant_type = form.get("grant_type", [""])[0]
+        if grant_type not in ("authorization_code", "refresh_token"):
+            self._send(400, b'{"error": "unsupported_grant_type"}', "application/json")
+            return
+        tokens = {"access_token": f"fake-{uuid.uuid4().hex}", "expires_in": 3600, "token_type": "Bearer"}
+        if grant_type == "authorization_code":
+            tokens["refresh_token"] = f"fake-refresh-{uuid.uuid4().hex}"
+        self._send(200, json.dumps(tokens).encode(), "application/json")
+
+    def _handle_batch(self, body: str) -> None:
+        message = email.message_from_string(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n{body}")
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        changed = False
+        for part in message.get_payload():
+            request_line, rest = part.get_payload().split("\n", 1)
+            method, path, _ = request_line.split(" ", 2)
+            inner = email.message_from_string(rest)
+            status, payload = handle_call(method, path, inner.get_payload())
+            changed = changed or (method != "GET" and status < 300)
+            content_id = part["Content-ID"].strip("<>")
+            parts.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(payload) if status != 204 else ''}\r\n"
+            )
+        response = "".join(parts) + f"--{boundary}--\r\n"
+        self._send(200, response.encode(), f"multipart/mixed; boundary={boundary}")
+        if changed:
+            notify_all()
+
+    do_GET = _handle
+    do_POST = _handle
+    do_PUT = _handle
+    do_PATCH = _handle
+    do_DELETE = _handle
+
+
+async def bench(port: int, task_count: int, user_count: int) -> None:
+    """Sync fake tasks for several users at once through the real client and report round trips"""
+    from app.core.config import settings
+    from app.services.google_api import CalendarCall, google_api
+    from app.services.google_calendar import CalendarTask, apply_event_changes, sync_tasks_to_calendar
+
+    settings.GOOGLE_CALENDAR_API_ENDPOINT = f"http://127.0.0.1:{port}/calendar/v3/"
+    settings.GOOGLE_TOKEN_URI = f"http://127.0.0.1:{port}/token"
+    due = datetime(2030, 1, 1, 9)
+
+    tokens = await google_api.exchange_code("fake-code")
+
+    async def get_token(force_refresh: bool) -> str:
+        if force_refresh:
+            tokens["access_token"], _ = await google_api.refresh_access_token(tokens["refresh_token"])
+        return tokens["access_token"]
+
+    # A few tasks point at events that no longer exist, to exercise the insert fallback
+    users = [
+        [
+            CalendarTask(
+                id=uuid.uuid4(),
+                title=f"Bench task {i}",
+                priority="medium",
+                status="pending",
+                due_date=due + timedelta(hours=i),
+                google_event_id="deleted-event" if i % 25 == 0 else None,
+            )
+            for i in range(task_count)
+        ]
+        for _ in range(user_count)
+    ]
+
+    async def run(label: str) -> None:
+        before = dict(stats)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(sync_tasks_to_calendar(tasks, get_token) for tasks in users))
+        elapsed = time.perf_counter() - start
+        totals = {key: sum(counts[key] for counts in results) for key in results[0]}
+        print(
+            f"{label}: {elapsed:.2f} s, {stats['http_requests'] - before['http_requests']} HTTP requests "
+            f"over {stats['connections'] - before['connections']} new connections, "
+            f"{stats['rate_limited'] - before['rate_limited']} rate limited, counts={totals}"
+        )
+
+    async def pull(label: str, sync_token: str | None) -> str | None:
+        """Inbound sync as the app does it, minus the database"""
+        before = dict(stats)
+        start = time.perf_counter()
+        params = {"maxResults": 2500, **({"syncToken": sync_token} if sync_token else {})}
+        changed, next_sync_token = await google_api.list_events(await get_token(False), **params)
+        outcomes = {}
+        for tasks in users:
+            by_event = {task.google_event_id: task for task in tasks if task.google_event_id and not task.deleted}
+            for outcome, matched in apply_event_changes(by_event, changed).items():
+                outcomes[outcome] = outcomes.get(outcome, 0) + len(matched)
+                if outcome == "local":
+                    for task in matched:
+                        task.google_event_fingerprint = None
+        elapsed = time.perf_counter() - start
+        print(
+            f"{label}: {elapsed:.2f} s, {stats['http_requests'] - before['http_requests']} HTTP requests, "
+            f"{len(changed)} events, outcomes={outcomes}"
+        )
+        return next_sync_token
+
+    try:
+        await run("first sync (inserts)")
+        await run("unchanged resync")
+        sync_token = await pull("initial pull (full listing)", None)
+
+        # Edit a tenth of the tasks, complete another tenth and delete a tenth
+        for tasks in users:
+            for i, task in enumerate(tasks):
+                if i % 10 == 1:
+                    task.title += " (edited)"
+                elif i % 10 == 2:
+                    task.status = "completed"
+                elif i % 10 == 3:
+                    task.deleted = True
+        await run("resync after edits")
+
+        # Users edit every 20th event in Google; every 40th task is then also edited locally
+        token = await get_token(False)
+        edits = []
+        for tasks in users:
+            for i, task in enumerate(tasks):
+                if i % 20 == 5:
+                    body = {
+                        "summary": f"[TaskMaster] Renamed in Google {i}",
+                        "start": {"dateTime": (task.due_date + timedelta(days=1)).isoformat() + "+05:30"},
+                    }
+                    edits.append(google_api.request(
+                        token, CalendarCall("PATCH", f"calendars/primary/events/{task.google_event_id}", body=body)
+                    ))
+        await asyncio.gather(*edits)
+        for tasks in users:
+            for i, task in enumerate(tasks):
+                if i % 40 == 5:
+                    task.title += " (edited locally later)"
+                    task.updated_at = datetime.utcnow()
+
+        sync_token = await pull("incremental pull", sync_token)
+        await run("push local winners")
+        await pull("incremental pull after push", sync_token)
+    finally:
+        await google_api.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds added to every HTTP request")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth call with 429")
+    parser.add_argument("--bench", type=int, default=0, help="sync this many fake tasks per user, then exit")
+    parser.add_argument("--users", type=int, default=1, help="users syncing concurrently in the bench")
+    args = parser.parse_args()
+
+    options.latency = args.latency / 1000
+    options.rate_limit_every = args.rate_limit_every
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Fake Calendar API listening on {args.host}:{args.port}")
+    if args.bench:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        asyncio.run(bench(args.port, args.bench, args.users))
+        server.shutdown()
+    else:
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
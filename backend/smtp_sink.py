@@ -0,0 +1,122 @@
+"""
+Local SMTP sink for email outbox throughput tests.
+
+Accepts any AUTH, swallows every message and prints delivery rates.
+Point the app at it with SMTP_HOST=127.0.0.1 SMTP_PORT=2525.
+
+Usage:
+    python smtp_sink.py [--port 2525]                # sink only
+    python smtp_sink.py --enqueue 5000               # sink + queue and drain 5000 emails
+"""
+import argparse
+import asyncio
+import time
+
+stats = {"messages": 0, "sessions": 0, "started": time.perf_counter()}
+
+
+async def handle_session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Speak just enough SMTP for aiosmtplib"""
+    stats["sessions"] += 1
+
+    async def reply(line: str) -> None:
+        writer.write(f"{line}\r\n".encode())
+        await writer.drain()
+
+    await reply("220 sink ESMTP ready")
+    try:
+        while line := await reader.readline():
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                writer.write(b"250-sink\r\n250-PIPELINING\r\n250-8BITMIME\r\n250 AUTH PLAIN LOGIN\r\n")
+                await writer.drain()
+            elif verb == "AUTH":
+                parts = command.split()
+                if parts[1].upper() == "LOGIN":
+                    await reply("334 VXNlcm5hbWU6")
+                    await reader.readline()
+                    await reply("334 UGFzc3dvcmQ6")
+                    await reader.readline()
+                elif len(parts) == 2:
+                    await reply("334 ")
+                    await reader.readline()
+                await reply("235 Authentication successful")
+            elif verb == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                while (await reader.readline()) not in (b".\r\n", b".\n", b""):
+                    pass
+                stats["messages"] += 1
+                await reply("250 Queued")
+            elif verb == "QUIT":
+                await reply("221 Bye")
+                break
+            elif verb in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                await reply("250 OK")
+            else:
+                await reply("502 Command not implemented")
+    finally:
+        writer.close()
+
+
+async def report() -> None:
+    """Print message totals and rate every few seconds"""
+    last = 0
+    while True:
+        await asyncio.sleep(5)
+        total = stats["messages"]
+        if total != last:
+            elapsed = time.perf_counter() - stats["started"]
+            print(f"{total} messages over {stats['sessions']} sessions ({total / elapsed:.0f} msg/s overall)")
+            last = total
+
+
+async def enqueue_and_drain(count: int) -> None:
+    """Queue `count` emails in the outbox and time the sender draining them"""
+    from sqlalchemy import func, select
+
+    from app.core.database import AsyncSessionLocal, Base, engine
+    from app.models.email_outbox import EmailOutbox, EmailStatusEnum
+    from app.services.email import enqueue_email
+    from app.services.email_outbox import email_outbox_worker
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as db:
+        for i in range(count):
+            enqueue_email(db, f"sink{i}@example.com", f"Sink test {i}", "<p>Hello from the sink test</p>")
+        await db.commit()
+
+    start = time.perf_counter()
+    while await email_outbox_worker.drain_once():
+        pass
+    elapsed = time.perf_counter() - start
+    await email_outbox_worker.stop()
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(func.count()).select_from(EmailOutbox).where(EmailOutbox.status == EmailStatusEnum.SENT)
+        )
+        print(f"Drained {count} emails in {elapsed:.2f} s ({count / elapsed:.0f} msg/s); {result.scalar()} sent total")
+    await engine.dispose()
+
+
+async def main(host: str, port: int, enqueue: int) -> None:
+    server = await asyncio.start_server(handle_session, host, port)
+    print(f"SMTP sink listening on {host}:{port}")
+    async with server:
+        if enqueue:
+            await enqueue_and_drain(enqueue)
+        else:
+            await report()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--enqueue", type=int, default=0, help="queue and drain this many emails, then exit")
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.enqueue))
@@ -0,0 +1,112 @@
+"""
+Concurrency stress test for XP awarding.
+
+Creates a throwaway user with N pending tasks, completes them all in
+parallel (one session and transaction per completion, like concurrent
+requests), then checks that no XP, task count or achievement was lost or
+duplicated. The user is removed afterwards.
+
+Usage:
+    python stress_award_xp.py [--tasks 500]
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
+
+from app.core.database import AsyncSessionLocal, Base, engine
+from app.models.gamification import Achievement, UserAchievement, UserStats
+from app.models.task import PriorityEnum, StatusEnum, Task
+from app.models.user import User
+from app.services.gamification import award_xp, calculate_level, calculate_xp_reward, initialize_achievements
+
+PRIORITIES = [PriorityEnum.LOW, PriorityEnum.MEDIUM, PriorityEnum.HIGH]
+
+
+async def complete(task_id: uuid.UUID, user_id: uuid.UUID) -> None:
+    """Complete one task the way POST /api/tasks/{id}/complete does"""
+    async with AsyncSessionLocal() as db:
+        task = await db.get(Task, task_id)
+        task.status = StatusEnum.COMPLETED
+        task.completed_at = datetime.utcnow()
+        await db.flush()
+        await award_xp(str(user_id), task.priority, db)
+
+
+async def main(task_count: int) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as db:
+        await initialize_achievements(db)
+
+    user_id = uuid.uuid4()
+    async with AsyncSessionLocal() as db:
+        db.add(User(
+            id=user_id,
+            username=f"stress_{user_id.hex[:8]}",
+            email=f"stress_{user_id.hex[:8]}@example.com",
+            hashed_password="!",
+        ))
+        await db.flush()
+        tasks = [
+            Task(user_id=user_id, title=f"Stress task {i}", priority=PRIORITIES[i % 3])
+            for i in range(task_count)
+        ]
+        db.add_all(tasks)
+        await db.commit()
+        task_ids = [task.id for task in tasks]
+
+    try:
+        # No stats row exists yet, so the first completions also race on creating it
+        print(f"Completing {task_count} tasks concurrently...")
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(complete(task_id, user_id) for task_id in task_ids),
+            return_exceptions=True,
+        )
+        print(f"Done in {time.perf_counter() - start:.2f} s")
+
+        errors = [r for r in results if isinstance(r, Exception)]
+        for error in errors[:5]:
+            print(f"  error: {error!r}")
+
+        async with AsyncSessionLocal() as db:
+            stats = (await db.execute(select(UserStats).where(UserStats.user_id == user_id))).scalar_one()
+            unlocked = (await db.execute(
+                select(func.count(), func.coalesce(func.sum(Achievement.xp_reward), 0))
+                .select_from(UserAchievement)
+                .join(Achievement, Achievement.id == UserAchievement.achievement_id)
+                .where(UserAchievement.user_id == user_id)
+            )).one()
+
+        # Every completion happens on the same day, so the streak is 1 throughout
+        expected_xp = sum(calculate_xp_reward(PRIORITIES[i % 3], 1) for i in range(task_count)) + unlocked[1]
+        checks = {
+            "no failed completions": not errors,
+            f"tasks_completed == {task_count}": stats.tasks_completed == task_count,
+            f"total_xp == {expected_xp}": stats.total_xp == expected_xp,
+            "level matches total_xp": stats.level == calculate_level(stats.total_xp),
+            "current_streak == 1": stats.current_streak == 1,
+        }
+        print(f"Stats: xp={stats.total_xp} level={stats.level} tasks={stats.tasks_completed} "
+              f"achievements={unlocked[0]}")
+        for name, ok in checks.items():
+            print(f"  {'PASS' if ok else 'FAIL'}  {name}")
+        return 0 if all(checks.values()) else 1
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=500)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.tasks)))
@@ -56,10 +56,20 @@ function Calendar() {
         return d;
     }, []);
 
+    const fetchGeneration = useRef(0);
+
     const fetchTasks = useCallback(async () => {
+        // Render from the first page on; only the latest fetch may update the
+        // list, and its partial pages never replace a longer list already shown
+        const generation = ++fetchGeneration.current;
+        const isLatest = () => generation === fetchGeneration.current;
         try {
-            const res = await tasksAPI.getAll();
-            setTasks(res.data);
+            const res = await tasksAPI.getAllPages({}, (loaded) => {
+                if (!isLatest()) return;
+                setTasks(prev => (loaded.length > prev.length ? loaded : prev));
+                setLoading(false);
+            });
+            if (isLatest()) setTasks(res.data);
         } catch (err) {
             console.error('Failed to fetch tasks:', err);
         } finally {
@@ -116,9 +126,17 @@ function Calendar() {
 
         try {
             setSyncing(true);
-            const res = await calendarAPI.sync();
-            const { created, errors } = res.data;
-            if (errors > 0) {
+            // Bring in Google-side edits first so the push doesn't overwrite them
+            const pulled = (await calendarAPI.pull()).data;
+            if (pulled.applied > 0) {
+                fetchTasks();
+            }
+            const job = await calendarAPI.syncAndWait();
+            const created = job.created + job.updated;
+            const { errors } = job;
+            if (job.status === 'failed') {
+                showMessage(`Sync failed: ${job.error_message || 'unknown error'}`, 'error');
+            } else if (errors > 0) {
                 showMessage(`Synced ${created} tasks. ${errors} tasks had errors.`, 'warning');
             } else {
                 showMessage(`Successfully synced ${created} tasks to Google Calendar!`, 'success');
@@ -24,7 +24,7 @@ import {
 } from '@mui/icons-material';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
-import { gamificationAPI, tasksAPI } from '../services/api';
+import { dashboardAPI } from '../services/api';
 
 const Dashboard = () => {
     const { user } = useAuth();
@@ -39,12 +39,10 @@ const Dashboard = () => {
 
     const loadData = async () => {
         try {
-            const [statsRes, tasksRes] = await Promise.all([
-                gamificationAPI.getStats(),
-                tasksAPI.getAll({ limit: 5, sort: 'created_at', order: 'desc' }), // Get last 5 tasks including completed
-            ]);
-            setStats(statsRes.data);
-            setTasks(tasksRes.data);
+            // Stats, achievements and tasks in a single round trip
+            const { data } = await dashboardAPI.get({ limit: 5 });
+            setStats({ ...data.stats, achievements_unlocked: data.achievements_unlocked });
+            setTasks([...data.upcoming_tasks, ...data.recently_completed]);
         } catch (error) {
             console.error('Error loading dashboard data:', error);
         } finally {
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback, useMemo } from 'react';
+import { useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import {
     Container,
     Box,
@@ -50,10 +50,18 @@ const Tasks = () => {
     });
     const [snackbar, setSnackbar] = useState({ open: false, message: '', severity: 'success' });
 
+    const loadGeneration = useRef(0);
+
     const loadTasks = useCallback(async () => {
+        // Only the latest load may update the list; while a reload is under
+        // way its partial pages never replace a longer list already shown
+        const generation = ++loadGeneration.current;
+        const isLatest = () => generation === loadGeneration.current;
         try {
-            const response = await tasksAPI.getAll({});
-            setTasks(response.data);
+            const response = await tasksAPI.getAllPages({}, (loaded) => {
+                if (isLatest()) setTasks(prev => (loaded.length > prev.length ? loaded : prev));
+            });
+            if (isLatest()) setTasks(response.data);
         } catch (_error) {
             console.error('Error loading tasks:', _error);
         }
@@ -2,6 +2,9 @@ import axios from 'axios';
 
 const API_URL = import.meta.env.VITE_API_URL;
 
+// Largest page GET /tasks accepts (MAX_PAGE_SIZE in backend/app/core/pagination.py)
+const MAX_TASK_PAGE_SIZE = 500;
+
 // Create axios instance
 const apiClient = axios.create({
     baseURL: API_URL,
@@ -51,6 +54,23 @@ export const authAPI = {
 // Tasks API
 export const tasksAPI = {
     getAll: (params) => apiClient.get('/tasks', { params }),
+    // Follow X-Next-Cursor until every page has been fetched, at the largest
+    // page size the API allows; onPage receives the tasks loaded so far after
+    // each page but the last, so callers can render before the load finishes
+    getAllPages: async (params = {}, onPage) => {
+        const tasks = [];
+        let cursor = null;
+        do {
+            const response = await apiClient.get('/tasks', {
+                params: { limit: MAX_TASK_PAGE_SIZE, ...params, cursor },
+            });
+            tasks.push(...response.data);
+            cursor = response.headers['x-next-cursor'] || null;
+            if (cursor && onPage) onPage([...tasks]);
+        } while (cursor);
+        return { data: tasks };
+    },
+    getChanges: (since, params) => apiClient.get('/tasks/changes', { params: { ...params, since } }),
     getOne: (id) => apiClient.get(`/tasks/${id}`),
     create: (data) => apiClient.post('/tasks', data),
     update: (id, data) => apiClient.put(`/tasks/${id}`, data),
@@ -64,11 +84,35 @@ export const gamificationAPI = {
     getAchievements: () => apiClient.get('/gamification/achievements'),
 };
 
+// Dashboard API
+export const dashboardAPI = {
+    get: (params) => apiClient.get('/dashboard', { params }),
+};
+
 // Calendar / Google Calendar API
 export const calendarAPI = {
     getAuthUrl: () => apiClient.get('/calendar/auth-url'),
     connect: (code) => apiClient.post(`/calendar/connect?code=${encodeURIComponent(code)}`),
     sync: (taskIds) => apiClient.post('/calendar/sync', { task_ids: taskIds || null }),
+    getSyncJob: (jobId) => apiClient.get(`/calendar/sync/${jobId}`),
+    // Start a background sync (or join the one already running) and poll until it finishes
+    syncAndWait: async (taskIds, intervalMs = 1000) => {
+        let job;
+        try {
+            job = (await calendarAPI.sync(taskIds)).data;
+        } catch (err) {
+            const jobId = err.response?.status === 409 && err.response.data?.detail?.job_id;
+            if (!jobId) throw err;
+            job = (await calendarAPI.getSyncJob(jobId)).data;
+        }
+        while (job.status === 'queued' || job.status === 'running') {
+            await new Promise((resolve) => setTimeout(resolve, intervalMs));
+            job = (await calendarAPI.getSyncJob(job.job_id)).data;
+        }
+        return job;
+    },
+    // Apply edits made in Google Calendar to tasks
+    pull: () => apiClient.post('/calendar/pull'),
     getStatus: () => apiClient.get('/calendar/status'),
     disconnect: () => apiClient.delete('/calendar/disconnect'),
 };